@@ -0,0 +1,68 @@
+"""add recipes fts
+
+Revision ID: 160268d07782
+Revises: a9b38910354b
+Create Date: 2026-10-18 10:12:41.523804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '160268d07782'
+down_revision: Union[str, None] = 'a9b38910354b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# unicode61 ç/ğ/ö/ş/ü/İ harflerini sadeleştirir ama "ı" ayrı bir harftir; index'e "i" olarak yazılır.
+# Sorgular da aynı şekilde sadeleştirildiği için "firinda" ile "fırında" eşleşir.
+def _folded(column: str) -> str:
+    return f"replace({column}, 'ı', 'i')"
+
+
+def _fts_values(prefix: str) -> str:
+    return ", ".join(_folded(f"{prefix}.{column}") for column in ("yemek", "malzeme", "yapilisi"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+        "yemek, malzeme, yapilisi, "
+        "tokenize = 'unicode61 remove_diacritics 2', "
+        "prefix = '2 3 4')"
+    )
+    # rowid tarif id'sidir; tetikleyiciler index'i `recipes` ile aynı transaction'da günceller
+    op.execute(
+        "CREATE TRIGGER recipes_fts_insert AFTER INSERT ON recipes BEGIN "
+        f"INSERT INTO recipes_fts (rowid, yemek, malzeme, yapilisi) VALUES (new.id, {_fts_values('new')}); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER recipes_fts_delete AFTER DELETE ON recipes BEGIN "
+        "DELETE FROM recipes_fts WHERE rowid = old.id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER recipes_fts_update AFTER UPDATE ON recipes BEGIN "
+        "DELETE FROM recipes_fts WHERE rowid = old.id; "
+        f"INSERT INTO recipes_fts (rowid, yemek, malzeme, yapilisi) VALUES (new.id, {_fts_values('new')}); "
+        "END"
+    )
+    op.execute(
+        "INSERT INTO recipes_fts (rowid, yemek, malzeme, yapilisi) "
+        f"SELECT id, {_fts_values('recipes')} FROM recipes"
+    )
+    op.execute("INSERT INTO recipes_fts (recipes_fts) VALUES ('optimize')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS recipes_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS recipes_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS recipes_fts_insert")
+    op.execute("DROP TABLE IF EXISTS recipes_fts")
@@ -0,0 +1,29 @@
+"""add products user_id date_added index
+
+Revision ID: 5d2e8f1c7a43
+Revises: 160268d07782
+Create Date: 2026-10-18 17:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8f1c7a43'
+down_revision: Union[str, None] = '160268d07782'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Son kullanma tarihi yaklaşan ürünler kullanıcı başına (user_id, date_added) aralığıyla okunur
+    op.create_index('ix_products_user_id_date_added', 'products', ['user_id', 'date_added'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_user_id_date_added', table_name='products')
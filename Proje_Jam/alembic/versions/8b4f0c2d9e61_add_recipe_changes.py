@@ -0,0 +1,56 @@
+"""add recipe changes
+
+Revision ID: 8b4f0c2d9e61
+Revises: 5d2e8f1c7a43
+Create Date: 2026-10-18 21:05:37.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4f0c2d9e61'
+down_revision: Union[str, None] = '5d2e8f1c7a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sürüm artan sırada verilir (AUTOINCREMENT); worker'lar son gördükleri sürümden sonrasını okur
+    op.create_table(
+        'recipe_changes',
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('version'),
+        sqlite_autoincrement=True,
+    )
+    # Hangi süreç yazarsa yazsın değişiklik `recipes` ile aynı transaction'da kaydedilir
+    op.execute(
+        "CREATE TRIGGER recipe_changes_insert AFTER INSERT ON recipes BEGIN "
+        "INSERT INTO recipe_changes (recipe_id) VALUES (new.id); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER recipe_changes_delete AFTER DELETE ON recipes BEGIN "
+        "INSERT INTO recipe_changes (recipe_id) VALUES (old.id); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER recipe_changes_update AFTER UPDATE ON recipes BEGIN "
+        "INSERT INTO recipe_changes (recipe_id) VALUES (new.id); "
+        "INSERT INTO recipe_changes (recipe_id) SELECT old.id WHERE old.id <> new.id; "
+        "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS recipe_changes_update")
+    op.execute("DROP TRIGGER IF EXISTS recipe_changes_delete")
+    op.execute("DROP TRIGGER IF EXISTS recipe_changes_insert")
+    op.drop_table('recipe_changes')
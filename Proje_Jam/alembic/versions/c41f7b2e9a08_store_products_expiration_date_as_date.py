@@ -0,0 +1,42 @@
+"""store products expiration_date as a date
+
+Revision ID: c41f7b2e9a08
+Revises: 8b4f0c2d9e61
+Create Date: 2026-10-19 09:26:51.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7b2e9a08'
+down_revision: Union[str, None] = '8b4f0c2d9e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Kolon Float tanımlıydı ama API'de tarih olarak tipliydi; tarih olur ve son kullanma sorgusu için index'lenir
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.alter_column('expiration_date', type_=sa.Date(), existing_type=sa.Float(), existing_nullable=True)
+    # Sayı olarak yazılmış değerler eklenme tarihinden itibaren gün sayısıdır
+    op.execute(
+        "UPDATE products SET expiration_date = date(date_added, '+' || CAST(expiration_date AS INTEGER) || ' days') "
+        "WHERE typeof(expiration_date) IN ('integer', 'real')"
+    )
+    op.create_index('ix_products_user_id_expiration_date', 'products', ['user_id', 'expiration_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_user_id_expiration_date', table_name='products')
+    op.execute(
+        "UPDATE products SET expiration_date = julianday(expiration_date) - julianday(date_added) "
+        "WHERE expiration_date IS NOT NULL"
+    )
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.alter_column('expiration_date', type_=sa.Float(), existing_type=sa.Date(), existing_nullable=True)
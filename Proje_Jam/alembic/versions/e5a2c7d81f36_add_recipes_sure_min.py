@@ -0,0 +1,32 @@
+"""add recipes sure_min
+
+Revision ID: e5a2c7d81f36
+Revises: c41f7b2e9a08
+Create Date: 2026-10-19 11:02:37.661845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c7d81f36'
+down_revision: Union[str, None] = 'c41f7b2e9a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # `sure` süre aralığının üst sınırıdır; alt sınır ayrı kolonda tutulur. Mevcut satırlarda alt sınır bilinmediği
+    # için üst sınır kopyalanır; CSV yeniden yüklenince (`python -m routers.recipe_loader`) gerçek aralık yazılır.
+    op.add_column('recipes', sa.Column('sure_min', sa.Integer(), nullable=True))
+    op.execute("UPDATE recipes SET sure_min = sure")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Tablo yeniden kurulmasın (FTS ve değişiklik günlüğü tetikleyicileri kalsın); SQLite 3.35+ DROP COLUMN
+    op.drop_column('recipes', 'sure_min')
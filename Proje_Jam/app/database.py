@@ -1,8 +1,13 @@
+import os
+from pathlib import Path
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./kitchenai_app.db"
+# Veritabanı yolu çalışma dizininden bağımsız olarak proje klasörüne sabitlenir
+BASE_DIR = Path(__file__).resolve().parent.parent
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'kitchenai_app.db'}")
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
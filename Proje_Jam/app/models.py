@@ -1,9 +1,8 @@
-from sqlalchemy.ext.mutable import MutableList
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Optional
 from datetime import date
 
 class User(Base):
@@ -23,11 +22,17 @@ class Product(Base):
     quantity = Column(Float)
     price = Column(Float, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    expiration_date = Column(Float, nullable=True)
+    # Boşsa son kullanma tarihi date_added + varsayılan raf ömrü sayılır
+    expiration_date = Column(Date, nullable=True)
     date_added = Column(Date)
     is_consumed = Column(Boolean, default=False)
     is_discarded = Column(Boolean, default=False)
     user = relationship("User", back_populates="products")
+    # Son kullanma tarihi yaklaşanlar kullanıcı başına son kullanma tarihi (yoksa eklenme tarihi) aralığıyla okunur
+    __table_args__ = (
+        Index("ix_products_user_id_date_added", "user_id", "date_added"),
+        Index("ix_products_user_id_expiration_date", "user_id", "expiration_date"),
+    )
     vitamins = relationship("ProductVitamin", back_populates="product")
 
 class Vitamin(Base):
@@ -62,10 +67,21 @@ class Recipe(Base):
     id = Column(Integer, primary_key=True, index=True)
     yemek = Column(String, index=True)
     mutfagi = Column(String)
-    sure = Column(Integer)
-    malzeme = Column(MutableList.as_mutable(String))
+    # CSV'deki "20-40 dk" gibi süre etiketi dakika aralığı olarak saklanır; açık uçluysa (`60 dk-Fazla`) `sure` boş
+    sure_min = Column(Integer)  # en az hazırlama süresi (dakika)
+    sure = Column(Integer)  # en fazla hazırlama süresi (dakika)
+    malzeme = Column(String)  # CSV'deki ham malzeme metni
     yapilisi = Column(String)
 
+# SQLAlchemy Model: RecipeChange
+class RecipeChange(Base):
+    # `recipes` tetikleyicileriyle aynı transaction'da yazılır; her worker kendi index'ini buradan günceller
+    __tablename__ = "recipe_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+    version = Column(Integer, primary_key=True)
+    recipe_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+
 
 # Pydantic Model: ProductBase (JSON çıktısı için)
 class ProductBase(BaseModel):
@@ -75,7 +91,7 @@ class ProductBase(BaseModel):
     quantity: float
     user_id: int
     price: float
-    expiration_date: date
+    expiration_date: Optional[date] = None
     date_added: date
     is_consumed: bool
     is_discarded: bool
@@ -83,13 +99,15 @@ class ProductBase(BaseModel):
     class Config:
         from_attributes = True
 # Pydantic Model: RecipeBase (JSON çıktısı için)
+# Alanlar `Recipe` kolonlarıyla aynıdır; süre aralığı ve mutfak boş olabilir, malzeme CSV'deki ham metindir
 class RecipeBase(BaseModel):
     id: int
     yemek: str
-    mutfagi: str
-    sure: int
-    malzeme: List[str]
-    yapilisi: str
+    mutfagi: Optional[str] = None
+    sure_min: Optional[int] = None
+    sure: Optional[int] = None
+    malzeme: str
+    yapilisi: str = ""
 
     class Config:
         from_attributes = True
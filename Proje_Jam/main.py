@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import auth, products
+from routers import auth, products, recipes
+from routers.recipe_index import get_recipe_index
 
 # Uygulama oluşturuluyor
 app = FastAPI()
@@ -17,6 +18,12 @@ app.add_middleware(
 # Rotaları bağlamak
 app.include_router(auth.router)
 app.include_router(products.router)
+app.include_router(recipes.router)
+
+# Tarif index'i uygulama açılışında bir kez yükleniyor
+@app.on_event("startup")
+def load_recipe_index():
+    get_recipe_index()
 
 # Ana sayfa rotası
 @app.get("/")
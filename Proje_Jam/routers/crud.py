@@ -1,31 +1,52 @@
 from dotenv import load_dotenv
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
-from app.models import Product
-from datetime import datetime
+from app.models import Product, Recipe
+from datetime import date, datetime, timedelta
 import os
-import re
-import pandas as pd
-import pickle
-from keras._tf_keras.keras.models import load_model
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import google.generativeai as genai
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 import markdown
 from bs4 import BeautifulSoup
+from .recipe_index import (
+    PAGING_MAX_RESULTS,
+    CursorExpired,
+    RankedSuggestions,
+    SuggestOptions,
+    decode_suggestion_cursor,
+    encode_suggestion_cursor,
+    get_recipe_index,
+    normalize_ingredient_set,
+    suggestion_page_cache,
+    suggestion_page_key,
+    sync_recipe_changes,
+)
+from .ingredient_parser import parse_ingredients
+from .recipe_executor import recipe_executor
+
+# Son kullanma tarihine bu kadar gün ya da daha az kalan ürünler (süresi geçmişler dahil) yaklaşan sayılır
+EXPIRING_WITHIN_DAYS = int(os.getenv("RECIPE_EXPIRING_WITHIN_DAYS", "2"))
+# Son kullanma tarihi bundan daha uzun süre önce geçmiş ürünler artık kilerde sayılmaz
+EXPIRING_LOOKBACK_DAYS = int(os.getenv("RECIPE_EXPIRING_LOOKBACK_DAYS", "60"))
+# Üründe son kullanma tarihi (`expiration_date`) yoksa eklenme tarihinden itibaren varsayılan raf ömrü
+DEFAULT_SHELF_LIFE_DAYS = int(os.getenv("RECIPE_DEFAULT_SHELF_LIFE_DAYS", "7"))
+# Öneriye en acil bu kadar malzeme girer
+EXPIRING_MAX_INGREDIENTS = int(os.getenv("RECIPE_EXPIRING_MAX_INGREDIENTS", "20"))
 
 # ------------------------
 # CREATE - Ürün Oluşturma
 # ------------------------
 
-def create_product(db: Session, user_id: int, name: str, category: str, quantity: float,price: float):
+def create_product(db: Session, user_id: int, name: str, category: str, quantity: float,price: float,
+                   expiration_date: date = None):
     db_product = Product(
         name=name,
         category=category,
         quantity=quantity,
         price=price,
         user_id=user_id,
+        expiration_date=expiration_date,
         date_added=datetime.today().date()
     )
     db.add(db_product)
@@ -49,13 +70,15 @@ def get_product_by_id(db: Session, user_id: int, product_id: int):
 # UPDATE - Ürün Güncelleme
 # ------------------------
 
-def update_product(db: Session, user_id: int, product_id: int, name: str, category: str, quantity: float,price: float):
+def update_product(db: Session, user_id: int, product_id: int, name: str, category: str, quantity: float,price: float,
+                   expiration_date: date = None):
     db_product = db.query(Product).filter(Product.id == product_id, Product.user_id == user_id).first()
     if db_product:
         db_product.name = name
         db_product.category = category
         db_product.quantity = quantity
         db_product.price = price
+        db_product.expiration_date = expiration_date
         db.commit()
         db.refresh(db_product)
         return db_product
@@ -79,65 +102,178 @@ def delete_product(db: Session, user_id: int, product_id: int):
 # AI - Seçilen Ürünlere Göre Tarif Önerisi
 # ------------------------
 
-# --- Yardımcı fonksiyonlar ---
-def turkish_lower(text):
-    return text.lower().replace("I", "ı").replace("İ", "i")
-
-def normalize_turkish_chars(text):
-    tr_map = str.maketrans("çğıöşü", "cgiosu")
-    return text.translate(tr_map)
-
-def parse_ingredients(ingredient_str):
-    raw_ingredients = re.split(r"[,\n]", ingredient_str)
-    ingredients = []
-
-    for item in raw_ingredients:
-        item = turkish_lower(item)
-        item = re.sub(r"(\d+[\.,]?\d*|\d+/\d+|½|¼|¾)\s*", "", item)
-        item = re.sub(
-            r"\b(adet|kaşık|tatlı kaşığı|yemek kaşığı|çay kaşığı|fincan|su bardağı|bardağı|bardak|gram|gr|kg|kilogram|"
-            r"tane|paket|çimdik|tutam|dal|diş|kutu|lt|litre|ml|mililitre|bağ|demet|orta boy|küçük boy|büyük boy)\b",
-            "",
-            item
+def suggest_recipes_page(user_ingredients: list[str], page_size: int = 5, cursor: str = None,
+                         options: SuggestOptions = None, detail: bool = False) -> dict:
+    """Önerileri sayfa sayfa döner; imleç verilirse malzemeler yeniden puanlanmaz, saklanan sıralamadan kesilir."""
+    if cursor:
+        key, offset = decode_suggestion_cursor(cursor)
+        ranked = suggestion_page_cache.get(key)
+        if ranked is None:
+            raise CursorExpired("Sayfalama oturumunun süresi doldu")
+    else:
+        index = get_recipe_index()
+        ingredient_set = normalize_ingredient_set(user_ingredients)
+        key = suggestion_page_key(index.suggestion_cache_key(ingredient_set, PAGING_MAX_RESULTS, options))
+        ranked = suggestion_page_cache.get_or_compute(
+            key, lambda: index.suggest_ranked(list(ingredient_set), PAGING_MAX_RESULTS, options)
         )
-        item = re.sub(
-            r"\b(biraz|az|yeteri kadar|bir miktar|göz kararı|isteğe bağlı|arzuya göre|gerektiği kadar)\b",
-            "",
-            item
+        # Önbellekteki sıralama yazımdan bağımsızdır; ilk sayfanın raporu bu isteğin girdileriyle kurulur
+        return {**_suggestion_page(ranked, key, 0, page_size, detail),
+                "query_terms": index.query_terms(user_ingredients)[1]}
+
+    return _suggestion_page(ranked, key, offset, page_size, detail)
+
+def _suggestion_page(ranked: RankedSuggestions, key: str, offset: int, page_size: int, detail: bool) -> dict:
+    end = offset + page_size
+    # Sayfa sıralanmış listenin sonunu geçiyorsa sonraki bölüm sıralanıp oturuma eklenir. Yalnızca verilmiş
+    # bir imleçten (liste içinden) devam edilir; elle büyütülmüş bir offset korpusun tamamını sıralatamaz.
+    while end > len(ranked) and offset <= len(ranked) and not ranked.exhausted:
+        ranked = ranked.extended()
+        suggestion_page_cache.put(key, ranked)
+    return {
+        "suggested_recipes": ranked.hits(offset, end, detail=detail),
+        "next_cursor": encode_suggestion_cursor(key, end) if end < len(ranked) or not ranked.exhausted else None,
+        "query_terms": ranked.query_terms,
+    }
+
+def get_expiring_ingredients(db: Session, user_id: int, today: date = None) -> dict:
+    """Kullanıcının son kullanma tarihi yaklaşan ürünleri; malzeme adı -> aciliyet (0, 1], en acilden başlar.
+
+    Son kullanma tarihi `expiration_date`, boşsa `date_added` + `DEFAULT_SHELF_LIFE_DAYS`'tir. Tarihi en fazla
+    `EXPIRING_WITHIN_DAYS` gün sonra olan ya da son `EXPIRING_LOOKBACK_DAYS` gün içinde geçmiş ürünler, kullanıcı
+    başına `(user_id, expiration_date)` ve `(user_id, date_added)` index'leri üzerinde aralık sorgusuyla okunur;
+    raf ömrü ne kadar uzun olursa olsun süresi geçmiş ürün dahildir. Aciliyet 1 / (1 + kalan gün), süresi
+    geçmişse 1'dir.
+    """
+    today = today or date.today()
+    earliest = today - timedelta(days=EXPIRING_LOOKBACK_DAYS)
+    latest = today + timedelta(days=EXPIRING_WITHIN_DAYS)
+    default_shelf_life = timedelta(days=DEFAULT_SHELF_LIFE_DAYS)
+    products = db.query(Product.name, Product.date_added, Product.expiration_date).filter(
+        Product.user_id == user_id,
+        or_(
+            Product.expiration_date.between(earliest, latest),
+            and_(
+                Product.expiration_date.is_(None),
+                Product.date_added.between(earliest - default_shelf_life, latest - default_shelf_life),
+            ),
+        ),
+        Product.is_consumed.isnot(True),
+        Product.is_discarded.isnot(True),
+    ).all()
+
+    urgency = {}
+    for name, date_added, expiration_date in products:
+        days_left = ((expiration_date or date_added + default_shelf_life) - today).days
+        weight = 1.0 / (1.0 + max(days_left, 0))
+        # Aynı ürün birden çok kez eklendiyse en acilinin aciliyeti geçerli
+        urgency[name] = max(weight, urgency.get(name, 0.0))
+    most_urgent = sorted(urgency.items(), key=lambda item: (-item[1], item[0]))[:EXPIRING_MAX_INGREDIENTS]
+    return {name: round(weight, 4) for name, weight in most_urgent}
+
+def suggest_recipes_for_expiring(ingredient_urgency: dict, page_size: int = 5, cursor: str = None,
+                                 options: SuggestOptions = None, detail: bool = False) -> dict:
+    """Aciliyet ağırlıklı önerileri sayfa sayfa döner.
+
+    İmleç yalnızca aynı kiler (malzeme ve aciliyetler) ve aynı index sürümü için geçerlidir; kiler ya da index
+    değiştiyse `CursorExpired` atılır, böylece başka bir kilerin sıralaması imleçle okunamaz.
+    """
+    index = get_recipe_index()
+    key = suggestion_page_key(
+        ("urgency", index.suggestion_cache_key(tuple(sorted(ingredient_urgency.items())), PAGING_MAX_RESULTS, options))
+    )
+    offset = 0
+    if cursor:
+        cursor_key, offset = decode_suggestion_cursor(cursor)
+        if cursor_key != key:
+            raise CursorExpired("Kiler ya da tarif index'i değişti")
+    ranked = suggestion_page_cache.get_or_compute(
+        key, lambda: index.suggest_urgent_ranked(ingredient_urgency, PAGING_MAX_RESULTS, options)
+    )
+    return _suggestion_page(ranked, key, offset, page_size, detail)
+
+def suggest_recipes_batch(ingredient_lists: list[list[str]], top_n: int = 5, options_list: list = None,
+                          detail: bool = False, top_ns: list[int] = None) -> list[dict]:
+    # `query_terms`: hangi girdinin hangi sözlük terimine eşlendiği, hangisinin atıldığı
+    return [
+        {"suggested_recipes": ranked.hits(detail=detail), "query_terms": ranked.query_terms}
+        for ranked in get_recipe_index().suggest_batch(
+            ingredient_lists, top_n=top_n, options_list=options_list, top_ns=top_ns
         )
-        item = re.sub(r"[^\w\sçğıöşü]", "", item)
-        item = item.strip()
-        if item:
-            ingredients.append(item)
-    return ingredients
-
-def suggest_recipes_by_ingredients(user_ingredients: list[str], top_n: int = 5):
-    recipes = pd.read_csv("turkish_food_recipes.csv", sep=";")
-    recipes["parsed_ingredients"] = recipes["ingredients"].apply(parse_ingredients)
-
-    with open("vocab.pkl", "rb") as f:
-        vocabulary = pickle.load(f)
-    vectorizer = CountVectorizer(vocabulary=vocabulary)
-    encoder = load_model("encoder_model.h5")
-
-    all_ingredient_texts = [" ".join(ings) for ings in recipes["parsed_ingredients"]]
-    X = vectorizer.transform(all_ingredient_texts).toarray().astype("float32")
-    recipe_embeddings = encoder.predict(X)
-
-    user_ingredients_cleaned = [
-        turkish_lower(re.sub(r"[^\w\sçğıöşü]", "", ing)).strip() for ing in user_ingredients
     ]
-    user_text = " ".join(user_ingredients_cleaned)
-    user_vector = vectorizer.transform([user_text]).toarray().astype("float32")
-    user_embedding = encoder.predict(user_vector)
 
-    similarities = cosine_similarity(user_embedding, recipe_embeddings)[0]
-    recipes["similarity"] = similarities
+def suggest_recipes_to_cook_now(user_ingredients: list[str], top_n: int = 10, max_missing: int = None,
+                                options: SuggestOptions = None, detail: bool = False) -> dict:
+    recipes, report = get_recipe_index().cook_now(
+        user_ingredients, top_n=top_n, max_missing=max_missing, options=options, detail=detail
+    )
+    return {"recipes": recipes, "query_terms": report}
+
+def get_recipe_engine_metrics():
+    return {**get_recipe_index().metrics(), "executor": recipe_executor.metrics()}
 
-    top_matches = recipes.sort_values(by="similarity", ascending=False).head(top_n)
 
-    return top_matches[["title", "similarity", "parsed_ingredients", "instructions"]].to_dict(orient="records")
+# ------------------------
+# TARİF - Detay
+# ------------------------
 
+def get_recipe_detail(db: Session, recipe_id: int):
+    # Öneri listeleri yalnızca id/başlık taşır; tam tarif buradan alınır
+    db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not db_recipe:
+        return None
+    return {
+        "id": db_recipe.id,
+        "title": db_recipe.yemek,
+        "cuisine": db_recipe.mutfagi,
+        "duration_min": db_recipe.sure_min,
+        "duration": db_recipe.sure,
+        "ingredients": db_recipe.malzeme,
+        "parsed_ingredients": parse_ingredients(db_recipe.malzeme or ""),
+        "instructions": db_recipe.yapilisi or "",
+    }
+
+
+# ------------------------
+# TARİF - Ekleme, Güncelleme, Silme (Canlı Index'e Artımlı Uygulanır)
+# ------------------------
+
+def create_recipe(db: Session, title: str, cuisine: str, duration: int, ingredients: str, instructions: str,
+                  duration_min: int = None):
+    # Tek değerli süre ("30 dk") hem en az hem en fazla süredir
+    db_recipe = Recipe(yemek=title, mutfagi=cuisine, sure=duration,
+                       sure_min=duration if duration_min is None else duration_min,
+                       malzeme=ingredients, yapilisi=instructions)
+    db.add(db_recipe)
+    db.commit()
+    db.refresh(db_recipe)
+    index_version = sync_recipe_changes().version
+    return db_recipe, index_version
+
+def update_recipe(db: Session, recipe_id: int, title: str, cuisine: str, duration: int, ingredients: str,
+                  instructions: str, duration_min: int = None):
+    db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not db_recipe:
+        return None, None
+    db_recipe.yemek = title
+    db_recipe.mutfagi = cuisine
+    db_recipe.sure = duration
+    db_recipe.sure_min = duration if duration_min is None else duration_min
+    db_recipe.malzeme = ingredients
+    db_recipe.yapilisi = instructions
+    db.commit()
+    db.refresh(db_recipe)
+    index_version = sync_recipe_changes().version
+    return db_recipe, index_version
+
+def delete_recipe(db: Session, recipe_id: int):
+    db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not db_recipe:
+        return None, None
+    db.delete(db_recipe)
+    db.commit()
+    index_version = sync_recipe_changes().version
+    return db_recipe, index_version
 
 
 # ------------------------
@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import numpy as np
+
+# ------------------------
+# AKIŞLI .NPY YAZICI
+# ------------------------
+
+class NpyAppender:
+    """Satır sayısı önceden bilinmeyen bir `.npy` dosyasına parça parça ekleme yapar.
+
+    Başlık için sabit boyutlu yer ayrılır, veri doğrudan diske akar ve `close` çağrısında başlık
+    gerçek şekille yeniden yazılır. Bellek kullanımı eklenen parçanın boyutuyla sınırlıdır.
+    Sonuç standart bir `.npy` dosyasıdır; `np.load(mmap_mode="r")` ile açılabilir.
+    """
+
+    HEADER_SIZE = 128
+    MAGIC = b"\x93NUMPY\x01\x00"
+
+    def __init__(self, path: Path, dtype, row_shape: tuple = ()):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self._file = open(self.path, "wb")
+        self._file.write(b"\x00" * self.HEADER_SIZE)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def append(self, array):
+        array = np.ascontiguousarray(array, dtype=self.dtype)
+        if array.shape[1:] != self.row_shape:
+            raise ValueError(f"Satır şekli {self.row_shape} bekleniyordu, {array.shape[1:]} geldi")
+        self._file.write(array.tobytes())
+        self.rows += len(array)
+
+    def close(self):
+        if self.closed:
+            return
+        header = repr({
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.rows, *self.row_shape),
+        })
+        header_len = self.HEADER_SIZE - len(self.MAGIC) - 2
+        header = header.ljust(header_len - 1) + "\n"
+        if len(header) != header_len:
+            raise ValueError("npy başlığı ayrılan alana sığmıyor")
+        self._file.seek(0)
+        self._file.write(self.MAGIC + header_len.to_bytes(2, "little") + header.encode("latin1"))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ------------------------
+# PAYLAŞILAN DİZE TABLOSU
+# ------------------------
+
+class StringTable:
+    """mmap'lenmiş UTF-8 blob ve int64 offset dizisinden oluşan salt okunur dize tablosu.
+
+    i. dize `blob[offsets[i]:offsets[i + 1]]` baytlarıdır. Dosyalar sayfa önbelleğinden okunduğu için aynı
+    artifact'ı açan tüm worker'lar aynı fiziksel belleği paylaşır; dize yalnızca erişildiğinde çözülür.
+    `separator` verilirse her satır bu ayraçla bölünmüş liste olarak döner.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, separator: str = None):
+        self.blob = blob
+        self.offsets = offsets
+        self.separator = separator
+
+    @classmethod
+    def open(cls, path: Path, name: str, separator: str = None):
+        return cls(
+            np.load(path / f"{name}.npy", mmap_mode="r"),
+            np.load(path / f"{name}_offsets.npy", mmap_mode="r"),
+            separator,
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        value = self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+        if self.separator is None:
+            return value
+        return value.split(self.separator) if value else []
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.blob.nbytes + self.offsets.nbytes
+
+
+class StringTableWriter:
+    """`StringTable` dosyalarını parça parça yazar; `separator` ile liste satırları tek dizeye birleştirilir."""
+
+    def __init__(self, path: Path, name: str, separator: str = None):
+        self.separator = separator
+        self.blob = NpyAppender(Path(path) / f"{name}.npy", np.uint8)
+        self.offsets = NpyAppender(Path(path) / f"{name}_offsets.npy", np.int64)
+        self.offsets.append([0])
+
+    @property
+    def closed(self) -> bool:
+        return self.blob.closed
+
+    def append(self, values):
+        if self.separator is not None:
+            values = [self.separator.join(value) for value in values]
+        encoded = [value.encode("utf-8") for value in values]
+        lengths = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+        self.offsets.append(self.blob.rows + np.cumsum(lengths))
+        self.blob.append(np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def close(self):
+        self.blob.close()
+        self.offsets.close()
@@ -0,0 +1,223 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .embedding_store import NpyAppender
+from .recipe_ranking import top_k_indices
+
+# ------------------------
+# TERS MALZEME INDEX'İ
+# ------------------------
+
+def _postings(parsed_ingredients, vocabulary: dict, analyzer, recipe_start: int = 0, item_start: int = 0):
+    """Tarif parçası için (kalem -> tarif, tarif kalem offset'leri, terim id'leri, kalem id'leri) üretir."""
+    item_recipe = []
+    recipe_item_offsets = []
+    pair_terms = []
+    pair_items = []
+
+    item_id = item_start
+    for recipe_row, ingredients in enumerate(parsed_ingredients, start=recipe_start):
+        for ingredient in ingredients:
+            # Sözlükte karşılığı olmayan kalemin posting'i olmaz; her zaman eksik sayılır
+            term_ids = {vocabulary[token] for token in analyzer(ingredient) if token in vocabulary}
+            item_recipe.append(recipe_row)
+            pair_terms.extend(term_ids)
+            pair_items.extend([item_id] * len(term_ids))
+            item_id += 1
+        recipe_item_offsets.append(item_id)
+    return (
+        np.asarray(item_recipe, dtype=np.int32),
+        np.asarray(recipe_item_offsets, dtype=np.int64),
+        np.asarray(pair_terms, dtype=np.int32),
+        np.asarray(pair_items, dtype=np.int32),
+    )
+
+def cook_now_scores(matched: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    coverage = matched / np.maximum(matched + missing, 1)
+    # Eksik sayısı tam sayı, kapsama [0, 1] aralığında: tek skor üç anahtarlı sıralamayı birebir korur
+    return -missing + 0.5 * coverage + 1e-9 * matched
+
+
+class InvertedIngredientIndex:
+    """Sözlük terim id'sinden malzeme kalemlerine giden ters index (sıralı int dizileri, CSR düzeni).
+
+    Her tarifin `parse_ingredients` çıktısındaki her kalem, listedeki sırasıyla bir "malzeme kalemi"dir.
+    Kullanıcının terimlerinden en az birini içeren kalem "eldeki malzeme" sayılır. Kapsama ve eksik malzeme
+    sayısı posting listelerinin birleşimi ve `bincount` ile, korpusu satır satır dolaşmadan hesaplanır.
+    """
+
+    ITEM_RECIPE = "ingredient_item_recipe.npy"
+    RECIPE_ITEM_OFFSETS = "ingredient_recipe_offsets.npy"
+    TERM_OFFSETS = "ingredient_term_offsets.npy"
+    TERM_ITEMS = "ingredient_term_items.npy"
+
+    def __init__(self, item_recipe: np.ndarray, recipe_item_offsets: np.ndarray,
+                 term_offsets: np.ndarray, term_items: np.ndarray):
+        self.item_recipe = item_recipe
+        self.recipe_item_offsets = recipe_item_offsets
+        self.term_offsets = term_offsets
+        self.term_items = term_items
+
+    @property
+    def recipe_count(self) -> int:
+        return len(self.recipe_item_offsets) - 1
+
+    def item_counts(self, recipe_rows: np.ndarray) -> np.ndarray:
+        # Sayılar offset'lerden okunur; worker başına korpus boyunda türetilmiş dizi tutulmaz
+        recipe_rows = np.asarray(recipe_rows)
+        return self.recipe_item_offsets[recipe_rows + 1] - self.recipe_item_offsets[recipe_rows]
+
+    @classmethod
+    def build(cls, parsed_ingredients, vocabulary: dict, analyzer):
+        # Bellekte kurulum; artımlı güncellemelerdeki küçük segmentler için. Büyük korpuslar yazıcıyla kurulur.
+        item_recipe, recipe_item_offsets, pair_terms, pair_items = _postings(parsed_ingredients, vocabulary, analyzer)
+        # Kararlı sıralama her posting listesindeki kalem id'lerini sıralı tutar
+        order = np.argsort(pair_terms, kind="stable")
+        term_counts = np.bincount(pair_terms, minlength=len(vocabulary))
+        return cls(
+            item_recipe,
+            np.concatenate([[0], recipe_item_offsets]).astype(np.int64),
+            np.concatenate([[0], np.cumsum(term_counts)]).astype(np.int64),
+            pair_items[order],
+        )
+
+    def save(self, path: Path):
+        np.save(path / self.ITEM_RECIPE, self.item_recipe)
+        np.save(path / self.RECIPE_ITEM_OFFSETS, self.recipe_item_offsets)
+        np.save(path / self.TERM_OFFSETS, self.term_offsets)
+        np.save(path / self.TERM_ITEMS, self.term_items)
+
+    @classmethod
+    def load(cls, path: Path):
+        if not (path / cls.TERM_ITEMS).exists():
+            return None
+        return cls(
+            np.load(path / cls.ITEM_RECIPE, mmap_mode="r"),
+            np.load(path / cls.RECIPE_ITEM_OFFSETS, mmap_mode="r"),
+            np.load(path / cls.TERM_OFFSETS, mmap_mode="r"),
+            np.load(path / cls.TERM_ITEMS, mmap_mode="r"),
+        )
+
+    def item_mask(self, term_ids) -> np.ndarray:
+        # Posting listelerinin birleşimi; sıralama yerine kalem sayısı kadar bir bit maskesi kullanılır
+        mask = np.zeros(len(self.item_recipe), dtype=bool)
+        for t in term_ids:
+            mask[self.term_items[self.term_offsets[t]:self.term_offsets[t + 1]]] = True
+        return mask
+
+    def matched_items(self, term_ids) -> np.ndarray:
+        return np.flatnonzero(self.item_mask(term_ids))
+
+    def shortlist_coverage(self, recipe_rows: np.ndarray, item_mask: np.ndarray):
+        """Yalnızca verilen tarifler için (eşleşen, eksik) kalem sayılarını döner; korpusun geri kalanına dokunmaz."""
+        counts = self.item_counts(recipe_rows)
+        segment_starts = np.cumsum(counts) - counts
+        # Kısa listedeki tariflerin kalem id'leri tek bir düz diziye açılır
+        segments = np.repeat(np.arange(len(recipe_rows)), counts)
+        items = np.arange(counts.sum()) - np.repeat(segment_starts, counts) + np.repeat(
+            self.recipe_item_offsets[recipe_rows], counts
+        )
+        matched = np.bincount(segments, weights=item_mask[items], minlength=len(recipe_rows)).astype(np.int64)
+        return matched, counts - matched
+
+    def matched_counts(self, matched_items: np.ndarray) -> np.ndarray:
+        return np.bincount(self.item_recipe[matched_items], minlength=self.recipe_count)
+
+    def cook_now(self, matched_items: np.ndarray, k: int, max_missing: int = None, row_mask: np.ndarray = None):
+        """Eldeki malzemelerle en az eksikle yapılabilecek tarifleri sıralar.
+
+        Sıralama: eksik kalem sayısı (artan), kapsama oranı (azalan), eşleşen kalem sayısı (azalan).
+        Yalnızca en az bir kalemi eşleşen (ve `row_mask` verildiyse maskeye uyan) tarifler sıralanır.
+        (tarif satırları, eşleşen, eksik) döner.
+        """
+        matched = self.matched_counts(matched_items)
+        candidates = np.flatnonzero(matched)
+        if row_mask is not None:
+            candidates = candidates[row_mask[candidates]]
+        missing = self.item_counts(candidates) - matched[candidates]
+        matched = matched[candidates]
+        if max_missing is not None:
+            keep = missing <= max_missing
+            candidates, matched, missing = candidates[keep], matched[keep], missing[keep]
+
+        best = top_k_indices(cook_now_scores(matched, missing), k)
+        return candidates[best], matched[best], missing[best]
+
+    def missing_ingredients(self, recipe_row: int, matched_items: np.ndarray) -> np.ndarray:
+        """Bir tarifin karşılanmayan kalemlerinin `parsed_ingredients` içindeki sıralarını döner."""
+        start, end = self.recipe_item_offsets[recipe_row], self.recipe_item_offsets[recipe_row + 1]
+        matched = np.isin(np.arange(start, end), matched_items)
+        return np.flatnonzero(~matched)
+
+
+class InvertedIngredientIndexWriter:
+    """Ters index'i tarif parçaları halinde diske yazar; bellek kullanımı parça boyutuyla sınırlıdır.
+
+    (terim, kalem) çiftleri geçici bir dosyaya akar. `close` terim sayılarından offset'leri hesaplar ve
+    çiftleri bloklar halinde counting sort ile `term_items` dosyasındaki yerlerine dağıtır.
+    """
+
+    PAIRS = "ingredient_pairs.tmp"
+    SCATTER_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, path: Path, vocabulary: dict, analyzer):
+        self.path = Path(path)
+        self.vocabulary = vocabulary
+        self.analyzer = analyzer
+        self.recipes = 0
+        self.items = 0
+        self.term_counts = np.zeros(len(vocabulary), dtype=np.int64)
+        self._item_recipe = NpyAppender(self.path / InvertedIngredientIndex.ITEM_RECIPE, np.int32)
+        self._recipe_item_offsets = NpyAppender(self.path / InvertedIngredientIndex.RECIPE_ITEM_OFFSETS, np.int64)
+        self._recipe_item_offsets.append([0])
+        self._pairs = open(self.path / self.PAIRS, "wb")
+
+    def append(self, parsed_ingredients):
+        item_recipe, recipe_item_offsets, pair_terms, pair_items = _postings(
+            parsed_ingredients, self.vocabulary, self.analyzer, recipe_start=self.recipes, item_start=self.items
+        )
+        pairs = np.empty((len(pair_terms), 2), dtype=np.int32)
+        pairs[:, 0] = pair_terms
+        pairs[:, 1] = pair_items
+        self._pairs.write(pairs.tobytes())
+        self.term_counts += np.bincount(pairs[:, 0], minlength=len(self.term_counts))
+        self._item_recipe.append(item_recipe)
+        self._recipe_item_offsets.append(recipe_item_offsets)
+        self.recipes += len(parsed_ingredients)
+        self.items += len(item_recipe)
+
+    def close(self):
+        if self._pairs.closed:
+            return
+        self._pairs.close()
+        self._item_recipe.close()
+        self._recipe_item_offsets.close()
+
+        pairs_path = self.path / self.PAIRS
+        term_offsets = np.concatenate([[0], np.cumsum(self.term_counts)]).astype(np.int64)
+        np.save(self.path / InvertedIngredientIndex.TERM_OFFSETS, term_offsets)
+
+        nnz = int(term_offsets[-1])
+        term_items = np.lib.format.open_memmap(
+            self.path / InvertedIngredientIndex.TERM_ITEMS, mode="w+", dtype=np.int32, shape=(nnz,)
+        )
+        if nnz:
+            pairs = np.memmap(pairs_path, dtype=np.int32, mode="r", shape=(nnz, 2))
+            cursor = term_offsets[:-1].copy()
+            # Çiftler kalem sırasıyla yazıldığından bloklar sırayla dağıtılınca posting listeleri sıralı kalır
+            for start in range(0, nnz, self.SCATTER_BLOCK_SIZE):
+                block = np.asarray(pairs[start:start + self.SCATTER_BLOCK_SIZE])
+                terms = block[:, 0]
+                order = np.argsort(terms, kind="stable")
+                sorted_terms = terms[order]
+                counts = np.bincount(sorted_terms, minlength=len(cursor))
+                group_starts = np.cumsum(counts) - counts
+                rank = np.arange(len(order)) - group_starts[sorted_terms]
+                term_items[cursor[sorted_terms] + rank] = block[order, 1]
+                cursor += counts
+            del pairs
+        term_items.flush()
+        del term_items
+        os.remove(pairs_path)
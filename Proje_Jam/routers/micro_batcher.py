@@ -0,0 +1,125 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# ------------------------
+# MICRO-BATCHER
+# ------------------------
+
+# Metriklerde kullanılan batch boyutu aralıkları (üst sınırlar)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class MicroBatcher:
+    """Eşzamanlı gelen tekil istekleri toplayıp tek bir `process_batch` çağrısıyla işler.
+
+    İlk istek geldiğinde en fazla `max_wait_ms` boyunca ya da `max_batch_size` dolana kadar
+    beklenir; sonuçlar her isteğin kendi Future'ına dağıtılır. `submit` senkron handler'lardan
+    (Starlette threadpool) çağrılmak üzere bloklayıcıdır. `close` sonrası gelen istekler doğrudan işlenir.
+    """
+
+    def __init__(self, process_batch, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self._metrics_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_batch_size_seen = 0
+        self._batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._batch_size_histogram["inf"] = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    def submit(self, item):
+        future = Future()
+        # Kapatma işareti kuyruğa aynı kilit altında girer; hiçbir istek işaretin arkasında kalmaz
+        with self._start_lock:
+            queued = not self._closed
+            if queued:
+                self._ensure_worker()
+                self._queue.put((item, future, time.perf_counter()))
+        if not queued:
+            return self.process_batch([item])[0]
+        return future.result()
+
+    def close(self):
+        """Worker thread'ini kuyruktaki istekler işlendikten sonra durdurur; index değiştirilirken çağrılır."""
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._pid == os.getpid():
+                self._queue.put(None)
+
+    def _ensure_worker(self):
+        # gunicorn --preload ile fork edilen worker'larda thread kopyalanmaz; süreç başına yeniden başlatılır
+        if self._pid == os.getpid():
+            return
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, args=(self._queue,), name="recipe-micro-batcher", daemon=True).start()
+        self._pid = os.getpid()
+
+    def _run(self, pending: queue.Queue):
+        stopping = False
+        while not stopping:
+            first = pending.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = pending.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            started = time.perf_counter()
+            try:
+                results = self.process_batch([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+    def _record(self, batch_size: int, waits: list[float]):
+        bucket = next((b for b in BATCH_SIZE_BUCKETS if batch_size <= b), "inf")
+        with self._metrics_lock:
+            self._batches += 1
+            self._items += batch_size
+            self._max_batch_size_seen = max(self._max_batch_size_seen, batch_size)
+            self._batch_size_histogram[bucket] += 1
+            self._total_wait += sum(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+                "max_batch_size_seen": self._max_batch_size_seen,
+                "batch_size_histogram": {str(k): v for k, v in self._batch_size_histogram.items()},
+                "avg_queue_wait_ms": round(self._total_wait / self._items * 1000, 3) if self._items else 0.0,
+                "max_queue_wait_ms": round(self._max_wait_seen * 1000, 3),
+            }
@@ -0,0 +1,150 @@
+import json
+import sys
+
+import h5py
+import numpy as np
+import scipy.sparse as sp
+
+# ------------------------
+# AKTİVASYONLAR
+# ------------------------
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    return x / x.sum(axis=-1, keepdims=True)
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+# ------------------------
+# NUMPY ENCODER
+# ------------------------
+
+class NumpyEncoder:
+    """`encoder_model.h5` içindeki Dense katmanlarını TensorFlow olmadan çalıştırır.
+
+    Ağırlıklar h5py ile okunur, ileri geçiş düz NumPy matris çarpımlarıyla yapılır.
+    Keras modelinin `predict` imzasıyla uyumludur. Girdi CSR ise ilk katman seyrek x yoğun çarpımla
+    hesaplanır; süre ve bellek sözlük boyutuyla değil sıfır olmayan eleman sayısıyla ölçeklenir.
+    """
+
+    accepts_sparse = True
+
+    def __init__(self, layers: list[tuple[np.ndarray, np.ndarray, str]]):
+        self.layers = layers
+
+    @classmethod
+    def from_h5(cls, path):
+        with h5py.File(path, "r") as f:
+            model_config = json.loads(f.attrs["model_config"])
+            weights_group = f["model_weights"]
+
+            layers = []
+            for layer in model_config["config"]["layers"]:
+                if layer["class_name"] == "InputLayer":
+                    continue
+                if layer["class_name"] != "Dense":
+                    raise ValueError(f"Desteklenmeyen katman tipi: {layer['class_name']}")
+
+                config = layer["config"]
+                activation = config.get("activation", "linear")
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"Desteklenmeyen aktivasyon: {activation}")
+
+                group = weights_group[config["name"]]
+                weights = {}
+                for weight_name in group.attrs["weight_names"]:
+                    if isinstance(weight_name, bytes):
+                        weight_name = weight_name.decode("utf-8")
+                    # Keras 2 "dense/kernel:0", Keras 3 "dense/kernel" şeklinde kaydeder
+                    short_name = weight_name.rsplit("/", 1)[-1].split(":")[0]
+                    weights[short_name] = np.asarray(group[weight_name], dtype=np.float32)
+
+                kernel = weights["kernel"]
+                bias = weights.get("bias", np.zeros(kernel.shape[1], dtype=np.float32))
+                layers.append((kernel, bias, activation))
+        return cls(layers)
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0][0].shape[0]
+
+    @property
+    def output_dim(self) -> int:
+        return self.layers[-1][0].shape[1]
+
+    def predict(self, X, batch_size: int = 4096, verbose: int = 0) -> np.ndarray:
+        X = X.tocsr().astype(np.float32, copy=False) if sp.issparse(X) else np.asarray(X, dtype=np.float32)
+        rows = X.shape[0]
+        if rows <= batch_size:
+            return self._forward(X)
+        return np.concatenate([self._forward(X[i:i + batch_size]) for i in range(0, rows, batch_size)])
+
+    def _forward(self, x) -> np.ndarray:
+        for kernel, bias, activation in self.layers:
+            # Seyrek girdide yalnızca dolu sütunların kernel satırları toplanır; sonuç yoğun ndarray
+            x = np.asarray(x @ kernel)
+            x += bias
+            x = ACTIVATIONS[activation](x)
+        return x
+
+
+def encode_bags(encoder, X, batch_size: int = 4096) -> np.ndarray:
+    """CSR bag-of-ingredients matrisini encode eder.
+
+    Seyrek girdiyi kabul eden encoder'a matris olduğu gibi verilir; Keras modeli için yoğun matris yalnızca
+    `batch_size` satırlık parçalar halinde açılır.
+    """
+    X = sp.csr_matrix(X, dtype=np.float32)
+    if getattr(encoder, "accepts_sparse", False):
+        return encoder.predict(X, batch_size=batch_size, verbose=0)
+    outputs = [encoder.predict(X[start:start + batch_size].toarray(), verbose=0)
+               for start in range(0, X.shape[0], batch_size)]
+    return np.concatenate(outputs)
+
+
+# ------------------------
+# KERAS İLE DOĞRULAMA
+# ------------------------
+
+def check_keras_parity(encoder_path, n_samples: int = 256, atol: float = 1e-5, seed: int = 0) -> float:
+    """NumPy çıktısını Keras `predict` çıktısıyla karşılaştırır; en büyük mutlak farkı döner.
+
+    Yalnızca geliştirme/CI ortamında çalıştırılır, çünkü TensorFlow gerektirir.
+    """
+    from keras._tf_keras.keras.models import load_model
+
+    numpy_encoder = NumpyEncoder.from_h5(encoder_path)
+    keras_encoder = load_model(encoder_path)
+
+    # Gerçek girdiler gibi seyrek, küçük tam sayılı bag-of-ingredients vektörleri
+    rng = np.random.default_rng(seed)
+    X = (rng.random((n_samples, numpy_encoder.input_dim)) < 0.01).astype(np.float32)
+    X *= rng.integers(1, 3, size=X.shape)
+
+    expected = keras_encoder.predict(X, verbose=0)
+    actual = numpy_encoder.predict(sp.csr_matrix(X))
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(expected, actual, atol=atol):
+        raise AssertionError(f"NumPy encoder Keras çıktısından sapıyor (max fark {max_diff:.2e})")
+    return max_diff
+
+
+if __name__ == "__main__":
+    from routers.recipe_artifact import ENCODER_PATH
+
+    diff = check_keras_parity(sys.argv[1] if len(sys.argv) > 1 else ENCODER_PATH)
+    print(f"Keras parity OK, max abs diff = {diff:.2e}")
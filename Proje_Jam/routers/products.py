@@ -1,20 +1,32 @@
-from datetime import datetime, timedelta
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.database import SessionLocal
 from .crud import (
     get_products,
     update_product,
     delete_product,
     create_product,
-    suggest_recipes_by_ingredients,
+    suggest_recipes_page,
+    suggest_recipes_for_expiring,
+    get_expiring_ingredients,
+    suggest_recipes_batch,
+    suggest_recipes_to_cook_now,
+    get_recipe_engine_metrics,
     create_kitchen_with_gemini
 )
-from app.models import Product, User
-from pydantic import BaseModel
-from typing import List
+from app.models import User
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import date
 from .auth import get_current_user
+from .recipe_executor import ExecutorSaturated, recipe_executor
+from .recipe_index import CursorExpired, InvalidCursor, SuggestOptions
+
+# Toplu öneri isteğinde kabul edilen en fazla sorgu sayısı
+MAX_RECIPE_BATCH_SIZE = 256
+# Sayfalı öneride tek sayfadaki en fazla tarif sayısı
+MAX_RECIPE_PAGE_SIZE = 50
 
 router = APIRouter(
     prefix="/products",
@@ -26,18 +38,45 @@ router = APIRouter(
 # --------------------------
 class IngredientRequest(BaseModel):
     ingredients: List[str]
+    # Boş bırakılırsa RECIPE_SEARCH_MODE / RECIPE_ANN_N_PROBE ayarları kullanılır
+    search_mode: Optional[Literal["exact", "ann"]] = None
+    n_probe: Optional[int] = None
+    ranking: Optional[Literal["similarity", "hybrid"]] = None
+    # Filtreler puanlamadan önce uygulanır: mutfaklardan biri ("Türk", "İtalya") ve süre aralığı (dakika);
+    # süre aralığı tarifin "20-40 dk" aralığıyla kesişmelidir
+    cuisines: Optional[List[str]] = None
+    min_duration: Optional[int] = None
+    max_duration: Optional[int] = None
+
+    def suggest_options(self) -> SuggestOptions:
+        # 0 veya negatif değer varsayılana düşmesin ya da sessizce 1'e çekilmesin
+        if self.n_probe is not None and self.n_probe < 1:
+            raise HTTPException(status_code=400, detail="n_probe en az 1 olmalıdır.")
+        return SuggestOptions(
+            search_mode=self.search_mode, n_probe=self.n_probe, ranking=self.ranking,
+            cuisines=tuple(self.cuisines) if self.cuisines else None,
+            min_duration=self.min_duration, max_duration=self.max_duration,
+        )
+
+class BatchIngredientRequest(IngredientRequest):
+    # Sorgu başına tarif sayısı; tekil öneriyle aynı sınırlar (sayfa boyutu 1..MAX_RECIPE_PAGE_SIZE)
+    top_n: int = Field(5, ge=1, le=MAX_RECIPE_PAGE_SIZE)
 
 class ProductCreate(BaseModel):
     name: str
     category: str
     quantity: float
     price:float
+    # Boşsa eklenme tarihi + varsayılan raf ömrü kullanılır
+    expiration_date: Optional[date] = None
 
 class ProductUpdate(BaseModel):
     name: str
     category: str
     quantity: float
     price:float
+    # Boşsa eklenme tarihi + varsayılan raf ömrü kullanılır
+    expiration_date: Optional[date] = None
 
 class ProductResponse(BaseModel):
     id: int
@@ -45,6 +84,7 @@ class ProductResponse(BaseModel):
     category: str
     quantity: float
     price:float
+    expiration_date: Optional[date] = None
 
 
     class Config:
@@ -61,6 +101,36 @@ def get_db():
     finally:
         db.close()
 
+# --------------------------
+# TARİF MOTORU EXECUTOR'I
+# --------------------------
+
+async def run_on_recipe_executor(func, *args, **kwargs):
+    # Yoğun puanlama ortak threadpool'u tüketmesin; kuyruk doluysa istek beklemeden 503 alır
+    try:
+        return await recipe_executor.run(func, *args, **kwargs)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Tarif motoru şu anda yoğun, lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+async def suggestion_page(ingredients: list[str], page_size: int, cursor: Optional[str], options: SuggestOptions = None,
+                          detail: bool = False):
+    return await paged_suggestions(suggest_recipes_page, ingredients, page_size, cursor, options=options, detail=detail)
+
+async def paged_suggestions(page_func, query, page_size: int, cursor: Optional[str], **kwargs):
+    # İlk sayfada sıralama bir kez yapılır; sonraki sayfalar `next_cursor` ile saklanan listeden kesilir
+    if not 1 <= page_size <= MAX_RECIPE_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size 1 ile {MAX_RECIPE_PAGE_SIZE} arasında olmalıdır.")
+    try:
+        return await run_on_recipe_executor(page_func, query, page_size, cursor, **kwargs)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfalama imleci.")
+    except CursorExpired:
+        raise HTTPException(status_code=410, detail="Sayfalama oturumunun süresi doldu, lütfen ilk sayfadan tekrar isteyin.")
+
 # --------------------------
 # READ - Giriş Yapan Kullanıcının Ürünlerini Listele
 # --------------------------
@@ -76,7 +146,8 @@ def read_my_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_
 
 @router.post("/", response_model=ProductResponse)
 def create_new_product(product: ProductCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_product = create_product(db, current_user["id"], product.name, product.category, product.quantity,product.price)
+    db_product = create_product(db, current_user["id"], product.name, product.category, product.quantity,product.price,
+                                product.expiration_date)
     return db_product
 
 # --------------------------
@@ -85,7 +156,8 @@ def create_new_product(product: ProductCreate, db: Session = Depends(get_db), cu
 
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_existing_product(product_id: int, product: ProductUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_product = update_product(db, current_user["id"], product_id, product.name, product.category, product.quantity,product.price)
+    db_product = update_product(db, current_user["id"], product_id, product.name, product.category, product.quantity,product.price,
+                                product.expiration_date)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
     return db_product
@@ -105,38 +177,108 @@ def delete_existing_product(product_id: int, db: Session = Depends(get_db), curr
 # --------------------------
 # AI - Tarif Önerisi (Malzemeye Göre)
 # --------------------------
+# Öneriler kısa kayıt döner (id, başlık, puan, eşleşen/eksik kalem sayısı); tam tarif `GET /recipes/{id}` ile
+# alınır. `detail=true` verilirse yapılış ve malzemeler de yanıta eklenir.
 @router.post("/ai/suggest-recipes")
-def suggest_recipes(request: IngredientRequest):
+async def suggest_recipes(request: IngredientRequest, page_size: int = 5, cursor: Optional[str] = None,
+                          detail: bool = False):
+    if not request.ingredients and not cursor:
+        raise HTTPException(status_code=400, detail="Malzeme listesi boş olamaz.")
+
+    try:
+        return await suggestion_page(
+            request.ingredients, page_size, cursor, options=request.suggest_options(), detail=detail
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Tarif önerilemedi: {str(e)}")
+
+# --------------------------
+# AI - Toplu Tarif Önerisi (Birden Çok Malzeme Listesi)
+# --------------------------
+@router.post("/ai/suggest-recipes/batch")
+async def suggest_recipes_batch_endpoint(requests: List[BatchIngredientRequest], detail: bool = False):
+    if not requests:
+        raise HTTPException(status_code=400, detail="Sorgu listesi boş olamaz.")
+    if len(requests) > MAX_RECIPE_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {MAX_RECIPE_BATCH_SIZE} sorgu gönderilebilir.")
+    if any(not request.ingredients for request in requests):
+        raise HTTPException(status_code=400, detail="Malzeme listesi boş olamaz.")
+
+    try:
+        results = await run_on_recipe_executor(
+            suggest_recipes_batch,
+            [request.ingredients for request in requests],
+            top_ns=[request.top_n for request in requests],
+            options_list=[request.suggest_options() for request in requests],
+            detail=detail,
+        )
+        return {"results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Tarif önerilemedi: {str(e)}")
+
+# --------------------------
+# AI - Eldeki Malzemelerle Hemen Yapılabilecek Tarifler
+# --------------------------
+@router.post("/ai/cook-now")
+async def cook_now(request: IngredientRequest, top_n: int = Query(10, ge=1, le=MAX_RECIPE_PAGE_SIZE),
+                   max_missing: Optional[int] = None,
+                   detail: bool = False):
     if not request.ingredients:
         raise HTTPException(status_code=400, detail="Malzeme listesi boş olamaz.")
 
     try:
-        results = suggest_recipes_by_ingredients(request.ingredients)
-        return {"suggested_recipes": results}
+        return await run_on_recipe_executor(
+            suggest_recipes_to_cook_now, request.ingredients, top_n=top_n, max_missing=max_missing,
+            options=request.suggest_options(), detail=detail,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Tarif önerilemedi: {str(e)}")
 
+# --------------------------
+# AI - Tarif Motoru Metrikleri
+# --------------------------
+@router.get("/ai/metrics")
+def recipe_engine_metrics(current_user: User = Depends(get_current_user)):
+    return get_recipe_engine_metrics()
+
 # --------------------------
 # AI - Tarif Önerisi (Son Kullanma Tarihine Göre)
 # --------------------------
+# Yalnızca giriş yapan kullanıcının kileri kullanılır; bozulmaya yakın malzemeyi kullanan tarif öne çıkar
 @router.get("/ai/suggest-recipes-from-expired")
-def suggest_recipes_from_expired_ingredients(db: Session = Depends(get_db)):
+async def suggest_recipes_from_expired_ingredients(page_size: int = 5, cursor: Optional[str] = None,
+                                                   cuisine: Optional[List[str]] = Query(None),
+                                                   min_duration: Optional[int] = None,
+                                                   max_duration: Optional[int] = None,
+                                                   detail: bool = False,
+                                                   db: Session = Depends(get_db),
+                                                   current_user: dict = Depends(get_current_user)):
     try:
-        five_days_ago = datetime.utcnow() - timedelta(days=5)
-
-        expired_products = db.query(Product).filter(Product.date_added <= five_days_ago).all()
-
-        if not expired_products:
-            raise HTTPException(status_code=404, detail="5 günden eski ürün bulunamadı.")
+        # Senkron DB sorgusu event loop'u bloklamasın
+        ingredient_urgency = await run_in_threadpool(get_expiring_ingredients, db, current_user["id"])
 
-        ingredients = [product.name for product in expired_products]
+        if not ingredient_urgency:
+            raise HTTPException(status_code=404, detail="Son kullanma tarihi yaklaşan ürün bulunamadı.")
 
-        results = suggest_recipes_by_ingredients(ingredients)
+        options = SuggestOptions(cuisines=tuple(cuisine) if cuisine else None,
+                                 min_duration=min_duration, max_duration=max_duration)
+        page = await paged_suggestions(
+            suggest_recipes_for_expiring, ingredient_urgency, page_size, cursor, options=options, detail=detail
+        )
         return {
-            "used_ingredients": ingredients,
-            "suggested_recipes": results
+            "used_ingredients": list(ingredient_urgency),
+            "ingredient_urgency": ingredient_urgency,
+            **page,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Tarif önerilemedi: {str(e)}")
 
@@ -0,0 +1,204 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .embedding_store import NpyAppender
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+PRECISIONS = ("float32", "float16", "int8")
+# Skorlama bloğu: float32'ye çevrilen geçici blok en fazla bu kadar satır tutar
+SCORE_BLOCK_ROWS = 65_536
+
+FLOAT16_EMBEDDINGS = "embeddings_normalized_f16.npy"
+INT8_CODES = "embeddings_normalized_i8.npy"
+INT8_SCALE = "embeddings_i8_scale.npy"
+INT8_OFFSET = "embeddings_i8_offset.npy"
+
+
+# ------------------------
+# SKORLAMA ÇEKİRDEKLERİ
+# ------------------------
+
+class Float32Embeddings:
+    """Normalize edilmiş float32 matris; referans doğruluk."""
+
+    precision = "float32"
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        return queries @ self.matrix.T
+
+    def rows(self, indices) -> np.ndarray:
+        return np.asarray(self.matrix[indices], dtype=np.float32)
+
+
+class Float16Embeddings(Float32Embeddings):
+    """Yarı boyutlu float16 matris. BLAS float16 desteklemediği için bloklar float32'ye çevrilip çarpılır;
+    tam boy float32 kopya hiçbir zaman oluşmaz."""
+
+    precision = "float16"
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        out = np.empty((len(queries), len(self.matrix)), dtype=np.float32)
+        for start in range(0, len(self.matrix), SCORE_BLOCK_ROWS):
+            block = self.matrix[start:start + SCORE_BLOCK_ROWS]
+            out[:, start:start + len(block)] = queries @ block.astype(np.float32).T
+        return out
+
+
+class Int8Embeddings:
+    """Boyut başına afin int8 niceleme: x ≈ kod * ölçek + kayma.
+
+    Skor kod matrisi üzerinde hesaplanır: q·x ≈ kod·(ölçek ⊙ q) + kayma·q. Ölçek sorguya katlandığı için
+    matris geri çözülmez; bloklar yalnızca BLAS'a verilmek üzere float32'ye çevrilir.
+    """
+
+    precision = "int8"
+
+    def __init__(self, codes: np.ndarray, scale: np.ndarray, offset: np.ndarray):
+        self.codes = codes
+        self.scale = scale
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scale.nbytes + self.offset.nbytes
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        scaled_queries = (queries * self.scale).astype(np.float32)
+        bias = (queries @ self.offset).astype(np.float32)[:, None]
+        out = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = self.codes[start:start + SCORE_BLOCK_ROWS]
+            out[:, start:start + len(block)] = scaled_queries @ block.astype(np.float32).T + bias
+        return out
+
+    def rows(self, indices) -> np.ndarray:
+        return self.codes[indices].astype(np.float32) * self.scale + self.offset
+
+
+def embedding_scores(embeddings, queries: np.ndarray) -> np.ndarray:
+    """(sorgu sayısı, satır sayısı) skor matrisi; düz float32 dizi ya da nicelenmiş matris kabul eder."""
+    if isinstance(embeddings, np.ndarray):
+        return queries @ embeddings.T
+    return embeddings.scores(queries)
+
+def embedding_rows(embeddings, indices) -> np.ndarray:
+    if isinstance(embeddings, np.ndarray):
+        return embeddings[indices]
+    return embeddings.rows(indices)
+
+
+# ------------------------
+# NİCELENMİŞ DOSYALARI YAZMA / AÇMA
+# ------------------------
+
+def write_quantized(path: Path, normalized_embeddings: np.ndarray, block_rows: int = SCORE_BLOCK_ROWS):
+    """float16 ve int8 kopyaları bloklar halinde yazar; float32 matris belleğe bütün olarak alınmaz."""
+    n, dim = normalized_embeddings.shape
+    low = np.full(dim, np.inf, dtype=np.float32)
+    high = np.full(dim, -np.inf, dtype=np.float32)
+    for start in range(0, n, block_rows):
+        block = np.asarray(normalized_embeddings[start:start + block_rows])
+        low = np.minimum(low, block.min(axis=0))
+        high = np.maximum(high, block.max(axis=0))
+
+    # 256 seviye [min, max] aralığına yayılır; sabit boyutlarda ölçek 0 yerine 1 alınır
+    scale = ((high - low) / 255.0).astype(np.float32)
+    scale[scale == 0] = 1.0
+    offset = (low + 128.0 * scale).astype(np.float32)
+    np.save(path / INT8_SCALE, scale)
+    np.save(path / INT8_OFFSET, offset)
+
+    with NpyAppender(path / FLOAT16_EMBEDDINGS, np.float16, (dim,)) as float16, \
+            NpyAppender(path / INT8_CODES, np.int8, (dim,)) as codes:
+        for start in range(0, n, block_rows):
+            block = np.asarray(normalized_embeddings[start:start + block_rows])
+            float16.append(block.astype(np.float16))
+            codes.append(np.clip(np.rint((block - offset) / scale), -128, 127).astype(np.int8))
+
+def open_embeddings(path: Path, precision: str, normalized_embeddings: np.ndarray):
+    if precision == "float32":
+        return Float32Embeddings(normalized_embeddings)
+    if precision == "float16":
+        return Float16Embeddings(np.load(path / FLOAT16_EMBEDDINGS, mmap_mode="r"))
+    if precision == "int8":
+        return Int8Embeddings(
+            np.load(path / INT8_CODES, mmap_mode="r"), np.load(path / INT8_SCALE), np.load(path / INT8_OFFSET)
+        )
+    raise ValueError(f"Bilinmeyen embedding hassasiyeti: {precision}")
+
+
+# ------------------------
+# DOĞRULUK RAPORU
+# ------------------------
+
+def accuracy_report(artifact, query_embeddings: np.ndarray, ks=(1, 10, 50)) -> dict:
+    """Her hassasiyet için bellek, sorgu süresi ve float32 sonuçlarıyla top-k örtüşmesini (recall@k) ölçer."""
+    from .recipe_ranking import l2_normalize, top_k_indices
+
+    queries = l2_normalize(query_embeddings)
+    reference = open_embeddings(artifact.path, "float32", np.asarray(artifact.normalized_embeddings))
+    reference_scores = reference.scores(queries)
+    reference_top = {k: [set(top_k_indices(row, k)) for row in reference_scores] for k in ks}
+
+    report = {"recipes": len(reference), "queries": len(queries), "precisions": {}}
+    for precision in PRECISIONS:
+        embeddings = open_embeddings(artifact.path, precision, reference.matrix)
+        # Isınma: mmap sayfaları ölçümden önce belleğe alınsın
+        embeddings.scores(queries[:1])
+
+        started = time.perf_counter()
+        scores = embeddings.scores(queries)
+        seconds = time.perf_counter() - started
+
+        result = {
+            "bytes": int(embeddings.nbytes),
+            "memory_ratio": round(embeddings.nbytes / reference.nbytes, 4),
+            "ms_per_query": round(1000 * seconds / len(queries), 4),
+            "max_abs_score_error": round(float(np.abs(scores - reference_scores).max()), 6),
+        }
+        for k in ks:
+            overlaps = [len(reference_top[k][i] & set(top_k_indices(row, k))) / k for i, row in enumerate(scores)]
+            result[f"top{k}_overlap_mean"] = round(float(np.mean(overlaps)), 4)
+            result[f"top{k}_overlap_min"] = round(float(np.min(overlaps)), 4)
+        report["precisions"][precision] = result
+    return report
+
+def sample_queries(parsed_ingredients: list, n_queries: int, seed: int = 0) -> list[str]:
+    # Kullanıcı sorgusu benzetimi: rastgele bir tariften 2-5 rastgele malzeme
+    rng = np.random.default_rng(seed)
+    candidates = [ings for ings in parsed_ingredients if ings]
+    queries = []
+    for i in rng.choice(len(candidates), n_queries):
+        ingredients = candidates[i]
+        size = min(len(ingredients), int(rng.integers(2, 6)))
+        queries.append(" ".join(rng.choice(ingredients, size, replace=False)))
+    return queries
+
+
+if __name__ == "__main__":
+    from routers.recipe_index import RecipeIndex
+
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    index = RecipeIndex.build()
+    query_embeddings = index.encode(sample_queries(index.parsed_ingredients, n_queries))
+    print(json.dumps(accuracy_report(index.artifact, query_embeddings), indent=2))
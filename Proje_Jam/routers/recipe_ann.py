@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import numpy as np
+
+from .quantization import embedding_rows
+from .recipe_ranking import l2_normalize, top_k_indices
+
+# ------------------------
+# IVF (INVERTED FILE) ANN INDEX
+# ------------------------
+
+class IVFIndex:
+    """Normalize edilmiş tarif embedding'leri üzerinde IVF tipi yaklaşık en yakın komşu index'i.
+
+    Embedding'ler küresel k-means ile `n_lists` kümeye ayrılır. Sorguda en yakın `n_probe`
+    kümenin üyeleri tam olarak puanlanır; `n_probe` büyüdükçe recall artar, gecikme uzar.
+    """
+
+    CENTROIDS = "ivf_centroids.npy"
+    OFFSETS = "ivf_offsets.npy"
+    IDS = "ivf_ids.npy"
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_ids: np.ndarray):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(cls, normalized_embeddings: np.ndarray, n_lists: int = None, n_iter: int = 20,
+              sample_size: int = 100_000, seed: int = 0):
+        n = len(normalized_embeddings)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n)))
+        n_lists = max(1, min(n_lists, n))
+
+        # Büyük korpuslarda merkezler bir örneklem üzerinde öğrenilir
+        rng = np.random.default_rng(seed)
+        sample = normalized_embeddings
+        if n > sample_size:
+            sample = normalized_embeddings[np.sort(rng.choice(n, sample_size, replace=False))]
+        sample = np.asarray(sample, dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            # Boş kalan kümeler rastgele bir noktayla yeniden başlatılır
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = l2_normalize(sums)
+
+        assignments = cls._assign(normalized_embeddings, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids, list_offsets, order.astype(np.int64))
+
+    @staticmethod
+    def _assign(embeddings: np.ndarray, centroids: np.ndarray, batch_size: int = 65_536) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(np.asarray(embeddings[i:i + batch_size]) @ centroids.T, axis=1)
+            for i in range(0, len(embeddings), batch_size)
+        ])
+
+    def save(self, path: Path):
+        np.save(path / self.CENTROIDS, self.centroids)
+        np.save(path / self.OFFSETS, self.list_offsets)
+        np.save(path / self.IDS, self.list_ids)
+
+    @classmethod
+    def load(cls, path: Path):
+        if not (path / cls.CENTROIDS).exists():
+            return None
+        return cls(
+            np.load(path / cls.CENTROIDS),
+            np.load(path / cls.OFFSETS),
+            np.load(path / cls.IDS, mmap_mode="r"),
+        )
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        if n_probe < 1:
+            raise ValueError(f"n_probe en az 1 olmalıdır: {n_probe}")
+        n_probe = min(n_probe, self.n_lists)
+        probes = top_k_indices(self.centroids @ query, n_probe)
+        return np.concatenate([
+            self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes
+        ])
+
+    def search(self, normalized_embeddings, query_embedding: np.ndarray, k: int, n_probe: int):
+        """(indeksler, skorlar) döner; yeterli aday bulunamazsa None döner ve tam aramaya düşülür."""
+        query = l2_normalize(query_embedding.reshape(1, -1))[0]
+        candidates = self.candidates(query, n_probe)
+        if len(candidates) < k:
+            return None
+        scores = embedding_rows(normalized_embeddings, candidates) @ query
+        best = top_k_indices(scores, k)
+        return candidates[best], scores[best]
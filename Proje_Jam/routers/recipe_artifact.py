@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from .embedding_store import NpyAppender, StringTable, StringTableWriter
+from .ingredient_index import InvertedIngredientIndex, InvertedIngredientIndexWriter
+from .numpy_encoder import NumpyEncoder
+from .quantization import open_embeddings, write_quantized
+from .recipe_ann import IVFIndex
+from .recipe_ranking import l2_normalize
+
+# ------------------------
+# DOSYA YOLLARI VE AYARLAR
+# ------------------------
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RECIPES_CSV_PATH = BASE_DIR / "turkish_food_recipes.csv"
+VOCAB_PATH = BASE_DIR / "vocab.pkl"
+ENCODER_PATH = BASE_DIR / "encoder_model.h5"
+ARTIFACTS_DIR = Path(os.getenv("RECIPE_ARTIFACTS_DIR", BASE_DIR / "recipe_artifacts"))
+
+# "numpy": TensorFlow hiç import edilmez (production); "keras": orijinal Keras modeli
+ENCODER_BACKEND = os.getenv("RECIPE_ENCODER_BACKEND", "numpy")
+
+# IVF küme sayısı; 0 ise korpus boyutunun karekökü kullanılır
+ANN_N_LISTS = int(os.getenv("RECIPE_ANN_N_LISTS", "0")) or None
+
+# Artifact düzeni değiştiğinde artırılır; eski artifact'lar otomatik geçersiz olur
+ARTIFACT_FORMAT_VERSION = 12
+
+
+# ------------------------
+# MODEL YÜKLEYİCİLER
+# ------------------------
+
+def load_vectorizer(vocab_path=VOCAB_PATH) -> CountVectorizer:
+    with open(vocab_path, "rb") as f:
+        vocabulary = pickle.load(f)
+    return CountVectorizer(vocabulary=vocabulary)
+
+def load_encoder(encoder_path=ENCODER_PATH, backend: str = ENCODER_BACKEND):
+    if backend == "numpy":
+        return NumpyEncoder.from_h5(encoder_path)
+    if backend == "keras":
+        from keras._tf_keras.keras.models import load_model
+        return load_model(encoder_path)
+    raise ValueError(f"Bilinmeyen encoder backend: {backend}")
+
+def compute_input_hash(paths, corpus_chunks=()) -> str:
+    """Model dosyaları ve korpus içeriğinden artifact anahtarı üretir.
+
+    Korpus `corpus_chunk` kolon parçaları (id'ler, malzeme metinleri, ...) olarak verilir; satır satır hash'lendiği için sonuç
+    parça boyutundan bağımsızdır, satır sırasına ise bağlıdır (artifact satırları korpus sırasını izler).
+    """
+    digest = hashlib.sha256(f"format={ARTIFACT_FORMAT_VERSION}".encode())
+    for chunk in corpus_chunks:
+        for row in zip(*chunk):
+            digest.update(("\x1f".join(map(str, row)) + "\x1e").encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hashes(texts) -> np.ndarray:
+    """Encoder girdisi metinlerinin 64 bitlik hash'leri; embedding yeniden kullanımında anahtar olarak saklanır."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little") for text in texts),
+        dtype=np.uint64, count=len(texts),
+    )
+
+
+def find_reusable_artifact(artifacts_dir, model_hash: str):
+    """Aynı sözlük ve encoder ile üretilmiş en yeni artifact'ı döner; embedding'leri yeniden kullanılabilir."""
+    candidates = []
+    for manifest_path in Path(artifacts_dir).glob(f"*/{RecipeArtifact.MANIFEST}"):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") == ARTIFACT_FORMAT_VERSION and manifest.get("model_hash") == model_hash:
+            candidates.append((manifest_path.stat().st_mtime, manifest_path.parent))
+    if not candidates:
+        return None
+    return RecipeArtifact.open(max(candidates)[1])
+
+def publish_bundle(artifacts_dir, artifact: "RecipeArtifact"):
+    """Artifact'ı `CURRENT` işaretçisiyle yayınlar; `RECIPE_INDEX_STARTUP=bundle` ile açılan servis bunu açar."""
+    pointer = Path(artifacts_dir) / RecipeArtifact.CURRENT
+    tmp_pointer = pointer.with_name(f"{pointer.name}.tmp-{os.getpid()}")
+    tmp_pointer.write_text(artifact.path.name + "\n", encoding="utf-8")
+    # Okuyucular ya eski ya yeni işaretçiyi görür
+    os.replace(tmp_pointer, pointer)
+
+def open_current_bundle(artifacts_dir):
+    pointer = Path(artifacts_dir) / RecipeArtifact.CURRENT
+    if not pointer.exists():
+        return None
+    return RecipeArtifact.open(Path(artifacts_dir) / pointer.read_text(encoding="utf-8").strip())
+
+def prune_artifacts(artifacts_dir, in_use: "RecipeArtifact") -> list[Path]:
+    """Kullanımdakinden eski tamamlanmış artifact'ları siler; `CURRENT`'ın gösterdiği bundle korunur.
+
+    Daha yeni artifact'lar başka bir worker'ın sıkıştırmasına ait olabileceği için silinmez; yarım kalmış
+    `.tmp-<pid>` klasörlerine (manifest'i yok) dokunulmaz. Eski index'in mmap'leri silinen dosyalar
+    üzerinde de son istek bitene kadar geçerli kalır.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    keep = {in_use.path.resolve()}
+    pointer = artifacts_dir / RecipeArtifact.CURRENT
+    if pointer.exists():
+        keep.add((artifacts_dir / pointer.read_text(encoding="utf-8").strip()).resolve())
+    cutoff = (in_use.path / RecipeArtifact.MANIFEST).stat().st_mtime
+
+    removed = []
+    for manifest_path in artifacts_dir.glob(f"*/{RecipeArtifact.MANIFEST}"):
+        path = manifest_path.parent
+        if path.resolve() in keep or manifest_path.stat().st_mtime >= cutoff:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    return removed
+
+
+# ------------------------
+# DİSKTEKİ EMBEDDING ARTIFACT'I
+# ------------------------
+
+class RecipeArtifact:
+    """Tarif embedding matrisi, parse edilmiş malzemeler ve tarif id'lerinden oluşan disk artifact'ı.
+
+    Tüm diziler `.npy` olarak saklanır ve `mmap_mode="r"` ile açılır; başlık, yapılış ve malzeme metinleri de
+    UTF-8 blob + offset tabloları (`StringTable`) olarak tutulur. Worker'lar artifact'a kopyasız bağlanır:
+    sayfalar işletim sisteminin önbelleğinde bir kez bulunur, worker sayısı arttıkça korpus belleği artmaz.
+    Normalize matrisin float16 ve int8 kopyaları da yazılır; arama hangisini kullanacağını `search_embeddings` ile seçer.
+    """
+
+    MANIFEST = "manifest.json"
+    # Yayınlanmış bundle'ın klasör adını tutan, `ARTIFACTS_DIR` altındaki işaretçi dosya
+    CURRENT = "CURRENT"
+    EMBEDDINGS = "embeddings.npy"
+    NORMALIZED_EMBEDDINGS = "embeddings_normalized.npy"
+    RECIPE_IDS = "recipe_ids.npy"
+    # `StringTable` adları; malzeme listeleri ayraçla tek dizeye birleştirilir
+    TITLES = "titles"
+    INSTRUCTIONS = "instructions"
+    INGREDIENTS = "parsed_ingredients"
+    INGREDIENT_SEPARATOR = "\x1f"
+    # Filtre kolonları: mutfak kodu (-1 boş), en fazla ve en az süre dakika (-1 bilinmiyor ya da açık uçlu)
+    CUISINE_CODES = "cuisine_codes.npy"
+    CUISINES = "cuisines.json"
+    DURATIONS = "durations.npy"
+    DURATIONS_MIN = "durations_min.npy"
+    # Malzeme metni hash'leri artan sırada ve her birinin satırı; embedding yeniden kullanımı ikili aramayla yapılır
+    TEXT_HASHES = "text_hashes.npy"
+    TEXT_HASH_ROWS = "text_hash_rows.npy"
+
+    def __init__(self, path: Path, manifest: dict, recipe_ids: np.ndarray, parsed_ingredients: StringTable,
+                 embeddings: np.ndarray, normalized_embeddings: np.ndarray, ann_index: IVFIndex = None,
+                 ingredient_index: InvertedIngredientIndex = None, titles: StringTable = None,
+                 instructions: StringTable = None, cuisine_codes: np.ndarray = None, cuisines: list = None,
+                 durations: np.ndarray = None, durations_min: np.ndarray = None, text_hashes: np.ndarray = None,
+                 text_hash_rows: np.ndarray = None):
+        self.path = path
+        self.manifest = manifest
+        self.recipe_ids = recipe_ids
+        self.parsed_ingredients = parsed_ingredients
+        self.titles = titles
+        self.instructions = instructions
+        self.cuisine_codes = cuisine_codes
+        self.cuisines = cuisines
+        self.durations = durations
+        self.durations_min = durations_min
+        self.text_hashes = text_hashes
+        self.text_hash_rows = text_hash_rows
+        self.embeddings = embeddings
+        self.normalized_embeddings = normalized_embeddings
+        self.ann_index = ann_index
+        self.ingredient_index = ingredient_index
+
+    @classmethod
+    def open(cls, path: Path):
+        # Manifest en son yazıldığı için varlığı artifact'ın tamamlandığını gösterir
+        manifest_path = path / cls.MANIFEST
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(path / cls.CUISINES, encoding="utf-8") as f:
+            cuisines = json.load(f)
+        return cls(
+            path,
+            manifest,
+            recipe_ids=np.load(path / cls.RECIPE_IDS, mmap_mode="r"),
+            parsed_ingredients=StringTable.open(path, cls.INGREDIENTS, separator=cls.INGREDIENT_SEPARATOR),
+            embeddings=np.load(path / cls.EMBEDDINGS, mmap_mode="r"),
+            normalized_embeddings=np.load(path / cls.NORMALIZED_EMBEDDINGS, mmap_mode="r"),
+            ann_index=IVFIndex.load(path),
+            ingredient_index=InvertedIngredientIndex.load(path),
+            titles=StringTable.open(path, cls.TITLES),
+            instructions=StringTable.open(path, cls.INSTRUCTIONS),
+            cuisine_codes=np.load(path / cls.CUISINE_CODES, mmap_mode="r"),
+            cuisines=cuisines,
+            durations=np.load(path / cls.DURATIONS, mmap_mode="r"),
+            durations_min=np.load(path / cls.DURATIONS_MIN, mmap_mode="r"),
+            text_hashes=np.load(path / cls.TEXT_HASHES, mmap_mode="r"),
+            text_hash_rows=np.load(path / cls.TEXT_HASH_ROWS, mmap_mode="r"),
+        )
+
+    def search_embeddings(self, precision: str = "float32"):
+        """Aramada puanlanacak matris: "float32", "float16" (yarı bellek) ya da "int8" (dörtte bir bellek)."""
+        return open_embeddings(self.path, precision, self.normalized_embeddings)
+
+
+class ArtifactWriter:
+    """Artifact'ı parça parça yazar; bellekte yalnızca o an eklenen parça tutulur.
+
+    Önce geçici klasöre yazılır, `close` sonunda tek rename ile yayınlanır; yarım artifact asla okunmaz.
+    """
+
+    UNSORTED_TEXT_HASHES = "text_hashes_unsorted.npy"
+
+    def __init__(self, path: Path, vectorizer: CountVectorizer, n_lists: int = ANN_N_LISTS):
+        self.path = Path(path)
+        self.n_lists = n_lists
+        self.tmp_path = self.path.with_name(f"{self.path.name}.tmp-{os.getpid()}")
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        self.tmp_path.mkdir(parents=True)
+
+        self.recipe_ids = NpyAppender(self.tmp_path / RecipeArtifact.RECIPE_IDS, np.int64)
+        self.embeddings = None
+        self.normalized_embeddings = None
+        self.ingredient_index = InvertedIngredientIndexWriter(
+            self.tmp_path, vectorizer.vocabulary, vectorizer.build_analyzer()
+        )
+        self.parsed_ingredients = StringTableWriter(
+            self.tmp_path, RecipeArtifact.INGREDIENTS, separator=RecipeArtifact.INGREDIENT_SEPARATOR
+        )
+        self.titles = StringTableWriter(self.tmp_path, RecipeArtifact.TITLES)
+        self.instructions = StringTableWriter(self.tmp_path, RecipeArtifact.INSTRUCTIONS)
+        self.cuisine_codes = NpyAppender(self.tmp_path / RecipeArtifact.CUISINE_CODES, np.int16)
+        self.durations = NpyAppender(self.tmp_path / RecipeArtifact.DURATIONS, np.int32)
+        self.durations_min = NpyAppender(self.tmp_path / RecipeArtifact.DURATIONS_MIN, np.int32)
+        # Satır sırasıyla yazılır, `close` hash'e göre sıralar
+        self.text_hashes = NpyAppender(self.tmp_path / self.UNSORTED_TEXT_HASHES, np.uint64)
+        self._cuisine_codes = {}
+
+    @property
+    def recipe_count(self) -> int:
+        return self.recipe_ids.rows
+
+    def append(self, recipe_ids, parsed_ingredients: list[list[str]], embeddings: np.ndarray,
+               titles: list[str], instructions: list[str], cuisines: list[str], durations: list[int],
+               durations_min: list[int]):
+        if self.embeddings is None:
+            row_shape = (embeddings.shape[1],)
+            self.embeddings = NpyAppender(self.tmp_path / RecipeArtifact.EMBEDDINGS, np.float32, row_shape)
+            self.normalized_embeddings = NpyAppender(
+                self.tmp_path / RecipeArtifact.NORMALIZED_EMBEDDINGS, np.float32, row_shape
+            )
+
+        self.parsed_ingredients.append(parsed_ingredients)
+        self.titles.append(titles)
+        self.instructions.append(instructions)
+        # Mutfak anahtarları parça sınırlarından bağımsız, artifact genelinde tek sözlükle kodlanır
+        self.cuisine_codes.append([
+            self._cuisine_codes.setdefault(cuisine, len(self._cuisine_codes)) if cuisine else -1
+            for cuisine in cuisines
+        ])
+        self.durations.append(durations)
+        self.durations_min.append(durations_min)
+        self.text_hashes.append(text_hashes([" ".join(ingredients) for ingredients in parsed_ingredients]))
+        self.recipe_ids.append(recipe_ids)
+        self.embeddings.append(embeddings)
+        self.normalized_embeddings.append(l2_normalize(embeddings))
+        self.ingredient_index.append(parsed_ingredients)
+
+    def close(self, manifest: dict, started: float = None) -> RecipeArtifact:
+        """Dosyaları kapatır, ANN index'ini ve nicemlenmiş kopyaları üretir, manifest'i yazıp artifact'ı yayınlar.
+
+        `started` verilirse toplam süre `build_seconds` olarak manifest'e eklenir.
+        """
+        finalize_started = time.perf_counter()
+        for table in (self.parsed_ingredients, self.titles, self.instructions, self.cuisine_codes, self.durations,
+                      self.durations_min, self.text_hashes):
+            table.close()
+        with open(self.tmp_path / RecipeArtifact.CUISINES, "w", encoding="utf-8") as f:
+            json.dump(list(self._cuisine_codes), f, ensure_ascii=False)
+        self.recipe_ids.close()
+        self.embeddings.close()
+        self.normalized_embeddings.close()
+        self.ingredient_index.close()
+
+        normalized_embeddings = np.load(self.tmp_path / RecipeArtifact.NORMALIZED_EMBEDDINGS, mmap_mode="r")
+        IVFIndex.train(normalized_embeddings, n_lists=self.n_lists).save(self.tmp_path)
+        write_quantized(self.tmp_path, normalized_embeddings)
+        del normalized_embeddings
+        self._sort_text_hashes()
+
+        finished = time.perf_counter()
+        manifest = {
+            **manifest,
+            "cuisine_count": len(self._cuisine_codes),
+            # Bundle içeriği: manifest dışındaki her dosyanın bayt boyutu
+            "files": {path.name: path.stat().st_size for path in sorted(self.tmp_path.iterdir())},
+            "timings": {**manifest.get("timings", {}), "finalize_seconds": round(finished - finalize_started, 3)},
+        }
+        if started is not None:
+            manifest["build_seconds"] = round(finished - started, 3)
+        with open(self.tmp_path / RecipeArtifact.MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        try:
+            os.rename(self.tmp_path, self.path)
+        except OSError:
+            # Aynı artifact'ı başka bir worker daha önce yayınladıysa onunkini kullan
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+        return RecipeArtifact.open(self.path)
+
+    def _sort_text_hashes(self):
+        # Satır başına 16 bayt; yeniden kullanım sorguları bu iki diziyi mmap ile açar
+        unsorted_path = self.tmp_path / self.UNSORTED_TEXT_HASHES
+        hashes = np.load(unsorted_path)
+        rows = np.argsort(hashes, kind="stable")
+        np.save(self.tmp_path / RecipeArtifact.TEXT_HASHES, hashes[rows])
+        np.save(self.tmp_path / RecipeArtifact.TEXT_HASH_ROWS, rows.astype(np.int64))
+        del hashes
+        os.remove(unsorted_path)
+
+    def abort(self):
+        for appender in (self.recipe_ids, self.embeddings, self.normalized_embeddings,
+                         self.parsed_ingredients, self.titles, self.instructions, self.cuisine_codes,
+                         self.durations, self.durations_min, self.text_hashes):
+            if appender is not None and not appender.closed:
+                appender.close()
+        self.ingredient_index.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
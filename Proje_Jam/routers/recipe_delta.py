@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .ingredient_index import InvertedIngredientIndex
+from .recipe_ranking import l2_normalize
+
+# ------------------------
+# ARTIMLI GÜNCELLEME SEGMENTİ
+# ------------------------
+
+@dataclass(frozen=True)
+class DeltaSegment:
+    """Son sıkıştırmadan bu yana eklenen/düzenlenen tarifler; taban artifact'tan sonra aranır.
+
+    Segment değişmezdir: her değişiklik eskisinden kopyalanmış yeni bir segment üretir. Yalnızca yeni
+    gelen tarifler encode edilir; mevcut satırların embedding'leri olduğu gibi taşınır.
+    """
+
+    recipes: pd.DataFrame
+    parsed_ingredients: list
+    embeddings: np.ndarray
+    normalized_embeddings: np.ndarray
+    ingredient_index: InvertedIngredientIndex
+
+    @classmethod
+    def empty(cls, columns, dim: int, vocabulary: dict, analyzer):
+        return cls.build(pd.DataFrame(columns=columns), [], np.empty((0, dim), dtype=np.float32), vocabulary, analyzer)
+
+    @classmethod
+    def build(cls, recipes: pd.DataFrame, parsed_ingredients: list, embeddings: np.ndarray,
+              vocabulary: dict, analyzer):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return cls(
+            recipes.reset_index(drop=True),
+            parsed_ingredients,
+            embeddings,
+            l2_normalize(embeddings) if len(embeddings) else embeddings,
+            InvertedIngredientIndex.build(parsed_ingredients, vocabulary, analyzer),
+        )
+
+    def __len__(self):
+        return len(self.parsed_ingredients)
+
+    def with_changes(self, removed_ids, upserts: pd.DataFrame, parsed_ingredients: list, embeddings: np.ndarray,
+                     vocabulary: dict, analyzer) -> "DeltaSegment":
+        # Düzenlenen ve silinen tariflerin eski satırları segmentten düşer, yeni halleri sona eklenir
+        keep = ~self.recipes["id"].isin(list(removed_ids)).to_numpy(dtype=bool)
+        return DeltaSegment.build(
+            pd.concat([self.recipes[keep], upserts], ignore_index=True) if len(self.recipes) else upserts,
+            [parsed for parsed, kept in zip(self.parsed_ingredients, keep) if kept] + list(parsed_ingredients),
+            np.concatenate([self.embeddings[keep], embeddings]),
+            vocabulary,
+            analyzer,
+        )
+
+
+@dataclass(frozen=True)
+class IndexState:
+    """Sorguların tek seferde okuduğu tutarlı görüntü: sürüm, taban satır silme işaretleri ve delta segment."""
+
+    version: int
+    base_alive: np.ndarray
+    base_tombstones: int
+    delta: DeltaSegment
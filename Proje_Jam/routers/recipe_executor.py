@@ -0,0 +1,127 @@
+"""Tarif motoru işleri için sınırlı, thread tabanlı executor.
+
+İşler bilerek süreç havuzunda çalışmaz: hepsi süreç genelindeki canlı `RecipeIndex`'i (delta segmenti, önbellekler,
+mmap'li artifact) okur. Alt süreçler index'in bayat bir kopyasıyla puanlar ve sonuçlar pickle ile taşınırdı.
+Puanlamanın ağır kısmı GIL'i bırakan NumPy/BLAS çağrılarıdır; çok çekirdek için uvicorn/gunicorn worker sayısı artırılır.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# Tarif puanlama/encode işleri Starlette'in ortak threadpool'u yerine bu havuzda çalışır
+RECIPE_EXECUTOR_WORKERS = int(os.getenv("RECIPE_EXECUTOR_WORKERS", "8"))
+# Çalışan işlerin dışında en fazla bu kadar iş bekleyebilir; fazlası 503 ile hemen reddedilir
+RECIPE_EXECUTOR_QUEUE_SIZE = int(os.getenv("RECIPE_EXECUTOR_QUEUE_SIZE", "64"))
+
+
+class ExecutorSaturated(Exception):
+    """Havuz ve kuyruk dolu; `retry_after` saniye sonra tekrar denenmesi önerilir."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Kuyruk dolu, {retry_after} sn sonra tekrar deneyin")
+        self.retry_after = retry_after
+
+
+# ------------------------
+# SINIRLI EXECUTOR
+# ------------------------
+
+class BoundedExecutor:
+    """Sabit sayıda thread ve sınırlı kuyruklu executor.
+
+    Yoğun AI istekleri hafif CRUD/auth isteklerinin thread'lerini tüketmez: async handler'lar işi buraya
+    bırakıp event loop'u serbest tutar. Kuyruk doluysa iş sıraya alınmaz, `ExecutorSaturated` atılır.
+    NumPy/BLAS çarpımları GIL'i bıraktığı için thread'ler gerçekten paralel puanlar.
+    """
+
+    def __init__(self, max_workers: int = RECIPE_EXECUTOR_WORKERS, max_queue: int = RECIPE_EXECUTOR_QUEUE_SIZE,
+                 name: str = "recipe-executor"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.name = name
+
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._total_run = 0.0
+
+    def _ensure_pool(self):
+        # gunicorn --preload ile fork edilen worker'larda havuz thread'leri kopyalanmaz; süreç başına yeniden kurulur
+        if self._pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._pid = os.getpid()
+            self._pending = self._running = 0
+
+    def retry_after(self) -> int:
+        # Kuyruğun boşalması için tahmini süre: bekleyen iş dalgası x ortalama çalışma süresi
+        avg_run = self._total_run / self._completed if self._completed else 1.0
+        return max(1, math.ceil(avg_run * (self._pending + 1) / self.max_workers))
+
+    def submit(self, func, *args, **kwargs):
+        enqueued = time.perf_counter()
+        with self._lock:
+            self._ensure_pool()
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(self.retry_after())
+            self._pending += 1
+            self._submitted += 1
+            pool = self._pool
+        try:
+            return pool.submit(self._run, func, args, kwargs, enqueued)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run(self, func, *args, **kwargs):
+        """İşi havuzda çalıştırır ve sonucunu event loop'u bloklamadan bekler."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def _run(self, func, args, kwargs, enqueued: float):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._total_wait += started - enqueued
+            self._max_wait_seen = max(self._max_wait_seen, started - enqueued)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._total_run += time.perf_counter() - started
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(self._total_wait / self._completed * 1000, 3) if self._completed else 0.0,
+                "max_queue_wait_ms": round(self._max_wait_seen * 1000, 3),
+                "avg_run_ms": round(self._total_run / self._completed * 1000, 3) if self._completed else 0.0,
+            }
+
+
+recipe_executor = BoundedExecutor()
@@ -0,0 +1,886 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from app.database import engine as default_engine
+
+from .ingredient_index import cook_now_scores
+from .ingredient_parser import clean_user_ingredients, parse_ingredients_bulk
+from .micro_batcher import MicroBatcher
+from .numpy_encoder import encode_bags
+from .recipe_artifact import (
+    ARTIFACTS_DIR,
+    ARTIFACT_FORMAT_VERSION,
+    ENCODER_PATH,
+    VOCAB_PATH,
+    RecipeArtifact,
+    compute_input_hash,
+    load_encoder,
+    load_vectorizer,
+    open_current_bundle,
+    prune_artifacts,
+    publish_bundle,
+)
+from .recipe_delta import DeltaSegment, IndexState
+from .recipe_ingest import INGEST_CHUNK_SIZE, INGEST_WORKERS, EmbeddingReuse, build_bundle
+from .quantization import embedding_rows, embedding_scores
+from .recipe_loader import (
+    RECIPE_COLUMNS,
+    count_recipes,
+    cuisine_key,
+    ensure_recipes_loaded,
+    read_change_version,
+    read_recipe_changes,
+    read_recipe_chunks,
+    read_recipes_by_ids,
+    staged_recipes_csv,
+    trim_recipe_changes,
+)
+from .recipe_ranking import hybrid_scores, l2_normalize, top_k_cosine_batch, top_k_indices, urgency_scores
+from .result_cache import TTLCache
+from .vocabulary_matcher import VocabularyMatcher
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# "build": açılışta korpus DB'den okunup eşleşen artifact açılır, yoksa süreç içinde üretilir;
+# "bundle": yalnızca `python -m routers.recipe_index build` ile yayınlanan bundle açılır, korpus okunmaz.
+# Bundle modunda, bundle'dan sonra DB'ye doğrudan yazılan tarifler yeni bir build'e kadar görünmez.
+INDEX_STARTUP = os.getenv("RECIPE_INDEX_STARTUP", "build")
+
+# "exact": tüm korpus puanlanır; "ann": IVF index'iyle yaklaşık arama
+SEARCH_MODE = os.getenv("RECIPE_SEARCH_MODE", "exact")
+ANN_N_PROBE = int(os.getenv("RECIPE_ANN_N_PROBE", "8"))
+SEARCH_MODES = ("exact", "ann")
+
+# Taban matrisin aramada kullanılan hassasiyeti: "float32", "float16" ya da "int8" (delta segment hep float32)
+EMBEDDING_PRECISION = os.getenv("RECIPE_EMBEDDING_PRECISION", "float32")
+
+# "similarity": yalnızca embedding benzerliği; "hybrid": kısa liste malzeme kapsamasıyla yeniden puanlanır
+RANKING_MODE = os.getenv("RECIPE_RANKING_MODE", "similarity")
+RANKING_MODES = ("similarity", "hybrid")
+HYBRID_SHORTLIST_SIZE = int(os.getenv("RECIPE_HYBRID_SHORTLIST_SIZE", "100"))
+HYBRID_SIMILARITY_WEIGHT = float(os.getenv("RECIPE_HYBRID_SIMILARITY_WEIGHT", "0.5"))
+HYBRID_COVERAGE_WEIGHT = float(os.getenv("RECIPE_HYBRID_COVERAGE_WEIGHT", "0.5"))
+HYBRID_MISSING_PENALTY = float(os.getenv("RECIPE_HYBRID_MISSING_PENALTY", "0.02"))
+
+# Eşzamanlı tekil sorgular encoder'a girmeden önce bu pencere/boyut sınırıyla toplanır
+MICROBATCH_ENABLED = os.getenv("RECIPE_MICROBATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("RECIPE_MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_WAIT_MS = float(os.getenv("RECIPE_MICROBATCH_WAIT_MS", "2"))
+
+# Filtre bu orandan fazla satır bırakıyorsa satırları toplamak yerine tüm matris puanlanıp maskelenir
+FILTER_FULL_SCAN_FRACTION = 0.5
+
+# Delta segment bu kadar tarife ya da taban bu kadar silme işaretine ulaşınca arka planda sıkıştırılır
+DELTA_COMPACT_ROWS = int(os.getenv("RECIPE_DELTA_COMPACT_ROWS", "1000"))
+DELTA_COMPACT_TOMBSTONES = int(os.getenv("RECIPE_DELTA_COMPACT_TOMBSTONES", "1000"))
+
+# Her worker `recipe_changes` tablosunu en fazla bu aralıkla yoklar; başka worker'ların yazdığı tarifler
+# bu gecikmeyle görünür. Sıkıştırmadan sonra bu süreden eski değişiklik kayıtları silinir.
+CHANGE_POLL_SECONDS = float(os.getenv("RECIPE_CHANGE_POLL_SECONDS", "1"))
+CHANGE_RETENTION_SECONDS = float(os.getenv("RECIPE_CHANGE_RETENTION_SECONDS", "86400"))
+
+# Sayfalı önerilerde bir seferde sıralanan sonuç sayısı; sonraki sayfalar bu listeden kesilir, liste bitince
+# aynı index görüntüsü üzerinde bir sonraki bölüm sıralanıp eklenir
+PAGING_MAX_RESULTS = int(os.getenv("RECIPE_PAGING_MAX_RESULTS", "200"))
+PAGING_CACHE_SIZE = int(os.getenv("RECIPE_PAGING_CACHE_SIZE", "256"))
+PAGING_CACHE_TTL_SECONDS = float(os.getenv("RECIPE_PAGING_CACHE_TTL_SECONDS", "300"))
+
+
+# ------------------------
+# YARDIMCI FONKSİYONLAR
+# ------------------------
+
+def normalize_ingredient_set(user_ingredients) -> tuple:
+    # Sıra ve tekrar sonuç önbelleği anahtarını etkilemesin diye sıralı, tekil küme
+    return tuple(sorted({ing for ing in clean_user_ingredients(user_ingredients) if ing}))
+
+def duration_mask(durations_min: np.ndarray, durations: np.ndarray, min_duration: int = None,
+                  max_duration: int = None) -> np.ndarray:
+    """Süre aralığı [en az, en fazla] istenen aralıkla kesişen satırlar; -1 bilinmiyor ya da açık uçlu demektir.
+
+    "20-40 dk" tarifi hem `max_duration=30` (20 dakikada bitebilir) hem `min_duration=30` ile seçilir. En az süresi
+    bilinmeyen tarif elenir; açık uçlu tarif ("60 dk-Fazla") her `min_duration` değerini karşılar.
+    """
+    mask = durations_min >= 0
+    if max_duration is not None:
+        mask &= durations_min <= max_duration
+    if min_duration is not None:
+        mask &= (durations < 0) | (durations >= min_duration)
+    return mask
+
+
+# ------------------------
+# ÖNERİ SEÇENEKLERİ
+# ------------------------
+
+@dataclass(frozen=True)
+class SuggestOptions:
+    """İstek başına arama/sıralama seçenekleri; boş alanlar ortam değişkenlerindeki varsayılanlara düşer."""
+
+    search_mode: str = None
+    n_probe: int = None
+    ranking: str = None
+    # Filtreler: mutfak etiketleri (herhangi biri) ve dakika cinsinden hazırlama süresi aralığı
+    cuisines: tuple = None
+    min_duration: int = None
+    max_duration: int = None
+
+    @property
+    def duration_filtered(self) -> bool:
+        return self.min_duration is not None or self.max_duration is not None
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.cuisines) or self.duration_filtered
+
+    def resolved(self) -> "SuggestOptions":
+        search_mode = self.search_mode or SEARCH_MODE
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Bilinmeyen arama modu: {search_mode}")
+        ranking = self.ranking or RANKING_MODE
+        if ranking not in RANKING_MODES:
+            raise ValueError(f"Bilinmeyen sıralama modu: {ranking}")
+        n_probe = None
+        if search_mode == "ann":
+            n_probe = ANN_N_PROBE if self.n_probe is None else self.n_probe
+            if n_probe < 1:
+                raise ValueError(f"n_probe en az 1 olmalıdır: {n_probe}")
+        # Aynı filtre farklı yazımlarla gelse de önbellek anahtarı aynı olsun
+        cuisines = tuple(sorted({cuisine_key(c) for c in self.cuisines} - {""})) if self.cuisines else None
+        return SuggestOptions(search_mode=search_mode, n_probe=n_probe, ranking=ranking,
+                              cuisines=cuisines or None, min_duration=self.min_duration,
+                              max_duration=self.max_duration)
+
+
+# ------------------------
+# SIRALANMIŞ ÖNERİ LİSTESİ VE SAYFALAMA
+# ------------------------
+
+@dataclass(frozen=True)
+class RankedSuggestions:
+    """Bir sorgunun sıralanmış aday satırları; yanıt sözlükleri yalnızca istenen sayfa için üretilir.
+
+    Sorgu anındaki `IndexState` ile birlikte saklandığından, arada index güncellense de sayfalar aynı
+    sıralamadan kesilir; sonuç atlanmaz ya da tekrarlanmaz.
+    """
+
+    index: "RecipeIndex"
+    state: IndexState
+    rows: np.ndarray
+    similarities: np.ndarray
+    matched: np.ndarray
+    missing: np.ndarray
+    # Yalnızca hibrit ve aciliyet ağırlıklı sıralamada dolu
+    scores: np.ndarray = None
+    # Girdi terimlerinin sözlüğe nasıl eşlendiği: {"mapped": [...], "dropped": [...]}
+    query_terms: dict = None
+    # Sıralamanın istendiği sonuç sınırı ve aynı sorguyu daha büyük bir sınırla yeniden sıralayan fonksiyon
+    limit: int = None
+    next_partition: object = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def exhausted(self) -> bool:
+        # Sınırdan az sonuç döndüyse korpusta başka aday kalmamıştır
+        return self.next_partition is None or len(self) < self.limit
+
+    def extended(self) -> "RankedSuggestions":
+        """Sonraki bölümü ekler; önceki sıra korunur, yalnızca listede olmayan satırlar sona eklenir.
+
+        Hibrit sıralamada daha geniş kısa liste üst sıraları değiştirebilir; verilmiş sayfalar bu yüzden yeniden
+        sıralanmaz, böylece sonuç atlanmaz ya da tekrarlanmaz.
+        """
+        more = self.next_partition(self.limit + PAGING_MAX_RESULTS)
+        fresh = ~np.isin(more.rows, self.rows)
+
+        def join(ours, theirs):
+            return None if ours is None else np.concatenate([ours, theirs[fresh]])
+
+        return replace(
+            self, rows=join(self.rows, more.rows), similarities=join(self.similarities, more.similarities),
+            matched=join(self.matched, more.matched), missing=join(self.missing, more.missing),
+            scores=join(self.scores, more.scores), limit=more.limit,
+        )
+
+    def hits(self, start: int = 0, stop: int = None, detail: bool = False) -> list[dict]:
+        hits = []
+        for j in range(start, min(len(self), len(self) if stop is None else stop)):
+            hit = self.index.recipe_hit(self.rows[j], self.similarities[j], self.state, detail)
+            if self.scores is not None:
+                hit["score"] = float(self.scores[j])
+            hit.update(matched_count=int(self.matched[j]), missing_count=int(self.missing[j]))
+            hits.append(hit)
+        return hits
+
+
+class InvalidCursor(ValueError):
+    pass
+
+class CursorExpired(LookupError):
+    pass
+
+def suggestion_page_key(cache_key) -> str:
+    # Aynı sorgu (sürüm, malzeme seti, seçenekler) aynı sıralanmış listeyi paylaşır
+    return hashlib.sha256(repr(cache_key).encode()).hexdigest()[:24]
+
+def encode_suggestion_cursor(key: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{key}:{offset}".encode()).decode().rstrip("=")
+
+def decode_suggestion_cursor(cursor: str):
+    try:
+        key, offset = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        offset = int(offset)
+    except ValueError as e:
+        raise InvalidCursor("Geçersiz sayfalama imleci") from e
+    if offset < 0:
+        raise InvalidCursor("Geçersiz sayfalama imleci")
+    return key, offset
+
+
+# ------------------------
+# RECIPE INDEX
+# ------------------------
+
+class RecipeIndex:
+    """Tarif korpusu, vektörleştirici, encoder ve tarif embedding'lerini bellekte tutar.
+
+    Korpus bir kez işlenir; istek başına yalnızca kullanıcı sorgusu encode edilip puanlanır.
+    Taban artifact değişmez; sonradan gelen değişiklikler `apply_changes` ile silme işaretleri ve küçük
+    bir delta segment olarak uygulanır. Satır numaraları tabanda [0, N), deltada N'den başlar.
+    """
+
+    def __init__(self, vectorizer: CountVectorizer, encoder):
+        self.vectorizer = vectorizer
+        self.analyzer = vectorizer.build_analyzer()
+        self.encoder = encoder
+        # Sözlük dışı yazımlar ("sogan", "domatess") encode edilmeden önce sözlük terimlerine eşlenir
+        self.vocabulary_matcher = None
+        self.recipe_embeddings = None
+        self.normalized_embeddings = None
+        self.ann_index = None
+        self.ingredient_index = None
+        self.artifact = None
+
+        # Taban korpusun tüm dizileri artifact'tan kopyasız (mmap) okunur; korpus DataFrame'i tutulmaz
+        self.titles = None
+        self.instructions = None
+        self.parsed_ingredients = None
+        self.recipe_ids = None
+        self.cuisine_codes = None
+        self.cuisine_codes_by_key = {}
+        self.durations = None
+        self.durations_min = None
+
+        self.state = None
+        self._changes_lock = threading.Lock()
+        # Index'in yansıttığı son `recipe_changes` sürümü ve okunduğu veritabanı
+        self.change_version = 0
+        self.engine = default_engine
+
+        self.encoder_batcher = None
+        if MICROBATCH_ENABLED:
+            self.encoder_batcher = MicroBatcher(
+                self.encode, max_batch_size=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_WAIT_MS
+            )
+
+    @classmethod
+    def build(cls, engine=None, vocab_path=VOCAB_PATH, encoder_path=ENCODER_PATH, artifacts_dir=ARTIFACTS_DIR,
+              reuse_from: "RecipeIndex" = None):
+        # Korpus `recipes` tablosundan parça parça okunur (hash ve gerekirse ingest); tablo boşsa ilk açılışta
+        # CSV'den doldurulur. Bellek kullanımı korpus boyutuyla değil parça boyutuyla sınırlıdır.
+        engine = engine or default_engine
+        ensure_recipes_loaded(engine)
+        # Sürüm korpustan önce okunur; okumalar arasında yazılan değişiklikler ilk yoklamada (bir kez daha) uygulanır
+        change_version = read_change_version(engine)
+        # Korpus değiştiyse yalnızca metni değişen tarifler encode edilir; servis açılışında ek süreç başlatılmaz
+        reuse = reuse_from.embedding_reuse() if reuse_from is not None else None
+        artifact, _ = build_bundle(
+            partial(read_recipe_chunks, engine), vocab_path, encoder_path, artifacts_dir, workers=0, reuse=reuse,
+        )
+
+        index = cls(load_vectorizer(vocab_path), load_encoder(encoder_path))
+        index.attach_artifact(artifact)
+        index.engine, index.change_version = engine, change_version
+        return index
+
+    @classmethod
+    def open_bundle(cls, engine=None, vocab_path=VOCAB_PATH, encoder_path=ENCODER_PATH, artifacts_dir=ARTIFACTS_DIR):
+        """Yayınlanmış bundle'ı açar; korpus okunmaz, parse ve encode yapılmaz."""
+        # Canlı tarif eklemelerinin id'leri bundle'dakilerle çakışmasın diye tablo yine de doldurulmuş olmalı
+        engine = engine or default_engine
+        ensure_recipes_loaded(engine)
+        artifact = open_current_bundle(artifacts_dir)
+        if artifact is None:
+            raise RuntimeError("Yayınlanmış tarif bundle'ı yok; önce `python -m routers.recipe_index build` çalıştırın")
+        if artifact.manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise RuntimeError(f"Bundle formatı eski ({artifact.path.name}); yeniden build edilmeli")
+        if artifact.manifest.get("model_hash") != compute_input_hash([vocab_path, encoder_path]):
+            raise RuntimeError(f"Bundle farklı bir sözlük/encoder ile üretilmiş ({artifact.path.name}); yeniden build edilmeli")
+
+        index = cls(load_vectorizer(vocab_path), load_encoder(encoder_path))
+        index.attach_artifact(artifact)
+        index.engine, index.change_version = engine, read_change_version(engine)
+        return index
+
+    def attach_artifact(self, artifact: RecipeArtifact):
+        self.artifact = artifact
+        self.recipe_embeddings = artifact.embeddings
+        self.normalized_embeddings = artifact.search_embeddings(EMBEDDING_PRECISION)
+        self.parsed_ingredients = artifact.parsed_ingredients
+        self.titles = artifact.titles
+        self.instructions = artifact.instructions
+        self.recipe_ids = artifact.recipe_ids
+        self.cuisine_codes = artifact.cuisine_codes
+        self.cuisine_codes_by_key = {key: code for code, key in enumerate(artifact.cuisines)}
+        self.durations = artifact.durations
+        self.durations_min = artifact.durations_min
+        self.ann_index = artifact.ann_index
+        self.ingredient_index = artifact.ingredient_index
+        # Aynı katlanmış yazıma düşen terimlerden korpusta en çok geçeni seçilsin
+        self.vocabulary_matcher = VocabularyMatcher(
+            self.vectorizer.vocabulary, np.diff(self.ingredient_index.term_offsets)
+        )
+        self.state = IndexState(
+            version=0,
+            base_alive=np.ones(len(self.titles), dtype=bool),
+            base_tombstones=0,
+            delta=DeltaSegment.empty(
+                RECIPE_COLUMNS, artifact.embeddings.shape[1], self.vectorizer.vocabulary, self.analyzer
+            ),
+        )
+
+    def close(self):
+        # Index devreden çıkınca micro-batcher thread'i durur; index ve mmap'leri serbest kalır
+        if self.encoder_batcher is not None:
+            self.encoder_batcher.close()
+
+    def embedding_reuse(self) -> EmbeddingReuse:
+        state = self.state
+        reuse = EmbeddingReuse()
+        reuse.add(state.delta.parsed_ingredients, state.delta.embeddings)
+        reuse.add_artifact(self.artifact)
+        return reuse
+
+    # ------------------------
+    # ARTIMLI GÜNCELLEME
+    # ------------------------
+
+    def apply_changes(self, upserts: pd.DataFrame = None, deleted_ids=()) -> int:
+        """Eklenen/düzenlenen tarifleri encode edip delta segmente ekler, silinenleri işaretler; yeni sürümü döner.
+
+        Eski satırlar yerinde silinmez, işaretlenir; sorgular tek bir `IndexState` okuduğundan güncelleme
+        sırasında da tutarlı sonuç alır.
+        """
+        if upserts is None:
+            upserts = pd.DataFrame(columns=RECIPE_COLUMNS)
+        upserts = upserts[RECIPE_COLUMNS].reset_index(drop=True)
+        changed_ids = set(upserts["id"].tolist()) | set(deleted_ids)
+
+        parsed_ingredients = parse_ingredients_bulk(upserts["ingredients"].tolist())
+        embeddings = (self.encode([" ".join(ings) for ings in parsed_ingredients]) if len(upserts)
+                      else np.empty((0, self.recipe_embeddings.shape[1]), dtype=np.float32))
+
+        with self._changes_lock:
+            state = self.state
+            base_alive = state.base_alive.copy()
+            base_alive[self.base_rows(changed_ids)] = False
+            delta = state.delta.with_changes(
+                changed_ids, upserts, parsed_ingredients, embeddings, self.vectorizer.vocabulary, self.analyzer
+            )
+            version = state.version + 1
+            self.state = IndexState(version, base_alive, int(len(base_alive) - base_alive.sum()), delta)
+        return version
+
+    def apply_change_log(self, changes) -> int:
+        """`recipe_changes` kayıtlarını uygular: tarifler DB'den güncel halleriyle okunur, bulunamayanlar silinmiştir."""
+        recipe_ids = {recipe_id for _, recipe_id in changes}
+        upserts = read_recipes_by_ids(recipe_ids, self.engine)
+        version = self.apply_changes(upserts, recipe_ids - set(upserts["id"].tolist()))
+        self.change_version = changes[-1][0]
+        return version
+
+    def base_rows(self, recipe_ids) -> np.ndarray:
+        # Taban id'leri artan sırada (korpus id'ye göre okunur); ikili arama ile worker başına hash tablosu gerekmez
+        recipe_ids = np.fromiter(recipe_ids, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.recipe_ids, recipe_ids), max(len(self.recipe_ids) - 1, 0))
+        return rows[self.recipe_ids[rows] == recipe_ids] if len(self.recipe_ids) else rows[:0]
+
+    def needs_compaction(self) -> bool:
+        state = self.state
+        return len(state.delta) >= DELTA_COMPACT_ROWS or state.base_tombstones >= DELTA_COMPACT_TOMBSTONES
+
+    # ------------------------
+    # ARAMA
+    # ------------------------
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return encode_bags(self.encoder, self.vectorizer.transform(texts))
+
+    def encode_query(self, text: str) -> np.ndarray:
+        if self.encoder_batcher is None:
+            return self.encode([text])[0]
+        return self.encoder_batcher.submit(text)
+
+    def search(self, query_embedding: np.ndarray, k: int, options: SuggestOptions = None, state: IndexState = None):
+        return self.search_batch(query_embedding.reshape(1, -1), [k], [options], state)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, ks: list[int], options_list: list = None,
+                     state: IndexState = None):
+        state = state or self.state
+        options_list = [(options or SuggestOptions()).resolved()
+                        for options in (options_list or [None] * len(query_embeddings))]
+        # Silinmiş taban satırları sonuçtan atılacağı için tabandan o kadar fazla aday istenir
+        base_ks = [k + state.base_tombstones for k in ks]
+
+        results = [None] * len(query_embeddings)
+        filtered = {}
+        exact_rows = []
+        for row, options in enumerate(options_list):
+            if options.filtered:
+                filtered[row] = self._search_filtered(query_embeddings[row], ks[row], options, state)
+                continue
+            if options.search_mode == "ann" and self.ann_index is not None:
+                results[row] = self.ann_index.search(
+                    self.normalized_embeddings, query_embeddings[row], base_ks[row], options.n_probe
+                )
+            # ANN index'i yoksa ya da yeterli aday bulamadıysa tam aramaya düşülür
+            if results[row] is None:
+                exact_rows.append(row)
+
+        if exact_rows:
+            exact_results = top_k_cosine_batch(
+                self.normalized_embeddings, query_embeddings[exact_rows], max(base_ks[row] for row in exact_rows)
+            )
+            for row, (indices, scores) in zip(exact_rows, exact_results):
+                results[row] = indices[:base_ks[row]], scores[:base_ks[row]]
+
+        if (state.base_tombstones or len(state.delta)) and len(filtered) < len(results):
+            delta_results = (top_k_cosine_batch(state.delta.normalized_embeddings, query_embeddings, max(ks))
+                             if len(state.delta) else None)
+            results = [
+                self._merge_delta(state, *result, delta_results[row] if delta_results else None, ks[row])
+                if result is not None else None
+                for row, result in enumerate(results)
+            ]
+        for row, result in filtered.items():
+            results[row] = result
+        return results
+
+    def _search_filtered(self, query_embedding: np.ndarray, k: int, options: SuggestOptions, state: IndexState):
+        """Filtreler puanlamadan önce satır maskesi olarak uygulanır; yalnızca filtreye uyan satırlar puanlanır."""
+        query = l2_normalize(query_embedding.reshape(1, -1))[0]
+        base_mask = self.base_filter_mask(options) & state.base_alive
+
+        rows = None
+        if options.search_mode == "ann" and self.ann_index is not None:
+            candidates = self.ann_index.candidates(query, options.n_probe)
+            candidates = candidates[base_mask[candidates]]
+            if len(candidates) >= k:
+                rows = candidates
+        if rows is None:
+            rows = np.flatnonzero(base_mask)
+        if len(rows) > FILTER_FULL_SCAN_FRACTION * len(base_mask):
+            scores = embedding_scores(self.normalized_embeddings, query[None, :])[0][rows]
+        else:
+            scores = embedding_rows(self.normalized_embeddings, rows) @ query
+
+        if len(state.delta):
+            delta_rows = np.flatnonzero(self.delta_filter_mask(state.delta, options))
+            rows = np.concatenate([rows, delta_rows + len(self.titles)])
+            scores = np.concatenate([scores, state.delta.normalized_embeddings[delta_rows] @ query])
+        best = top_k_indices(scores, k)
+        return rows[best], scores[best]
+
+    def base_filter_mask(self, options: SuggestOptions) -> np.ndarray:
+        """Taban satırları için mutfak/süre maskesi; index kurulurken kodlanmış kolonlar üzerinde vektörel."""
+        mask = np.ones(len(self.titles), dtype=bool)
+        if options.cuisines:
+            codes = [self.cuisine_codes_by_key[key] for key in options.cuisines if key in self.cuisine_codes_by_key]
+            mask &= np.isin(self.cuisine_codes, codes)
+        if options.duration_filtered:
+            mask &= duration_mask(self.durations_min, self.durations, options.min_duration, options.max_duration)
+        return mask
+
+    @staticmethod
+    def delta_filter_mask(delta: DeltaSegment, options: SuggestOptions) -> np.ndarray:
+        mask = np.ones(len(delta), dtype=bool)
+        if options.cuisines:
+            mask &= np.isin([cuisine_key(label) for label in delta.recipes["cuisine"]], list(options.cuisines))
+        if options.duration_filtered:
+            # Bilinmeyen (NaN) süreler taban kolonlarındaki gibi -1 olur
+            durations_min, durations = (
+                pd.to_numeric(delta.recipes[column], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+                for column in ("duration_min", "duration")
+            )
+            mask &= duration_mask(durations_min, durations, options.min_duration, options.max_duration)
+        return mask
+
+    def _merge_delta(self, state: IndexState, indices, scores, delta_result, k: int):
+        alive = state.base_alive[indices]
+        indices, scores = indices[alive], scores[alive]
+        if delta_result is not None:
+            delta_indices, delta_scores = delta_result
+            indices = np.concatenate([indices, delta_indices + len(self.titles)])
+            scores = np.concatenate([scores, delta_scores])
+        best = top_k_indices(scores, k)
+        return indices[best], scores[best]
+
+    def suggest_ranked(self, user_ingredients: list[str], top_n: int, options: SuggestOptions = None,
+                       state: IndexState = None):
+        state = state or self.state
+        options = (options or SuggestOptions()).resolved()
+        term_ids, report = self.query_terms(user_ingredients)
+        user_embedding = self.encode_query(self.vocabulary_matcher.text(term_ids))
+
+        indices, scores = self.search(user_embedding, self.shortlist_size(top_n, options), options, state)
+        return replace(
+            self.ranked(user_ingredients, indices, scores, top_n, options, state), query_terms=report, limit=top_n,
+            next_partition=lambda limit: self.suggest_ranked(user_ingredients, limit, options, state),
+        )
+
+    def suggest_batch(self, ingredient_lists: list[list[str]], top_n: int = 5,
+                      options_list: list = None, top_ns: list[int] = None) -> list[RankedSuggestions]:
+        """`top_ns` sorgu başına tarif sayısıdır; verilmezse her sorgu `top_n` tarif döner."""
+        state = self.state
+        top_ns = top_ns or [top_n] * len(ingredient_lists)
+        options_list = [(options or SuggestOptions()).resolved()
+                        for options in (options_list or [None] * len(ingredient_lists))]
+        # Terim eşleme raporu sorgu başına bir kez üretilir ve sonuçla birlikte döner
+        mapped = [self.query_terms(ingredients) for ingredients in ingredient_lists]
+        # Tüm sorgular tek vektörleştirme ve tek encoder ileri geçişiyle işlenir
+        user_embeddings = self.encode([self.vocabulary_matcher.text(term_ids) for term_ids, _ in mapped])
+
+        ks = [self.shortlist_size(k, options) for k, options in zip(top_ns, options_list)]
+        results = self.search_batch(user_embeddings, ks, options_list, state)
+        return [
+            replace(self.ranked(ingredients, indices, scores, k, options, state), query_terms=report)
+            for ingredients, (indices, scores), k, options, (_, report)
+            in zip(ingredient_lists, results, top_ns, options_list, mapped)
+        ]
+
+    def suggest_urgent_ranked(self, ingredient_weights: dict, top_n: int, options: SuggestOptions = None,
+                              state: IndexState = None):
+        """Malzemeleri aciliyet ağırlığıyla kullanan öneri; `ingredient_weights` malzeme -> (0, 1] aciliyettir.
+
+        Aday kısa liste tüm malzemelerle aranır, sonra hibrit sıralamadaki gibi yeniden puanlanır; kapsama
+        terimi, tarifin kullandığı malzemelerin toplam aciliyet payıdır (bozulmak üzere olanı kullanan öne çıkar).
+        """
+        state = state or self.state
+        options = (options or SuggestOptions()).resolved()
+        ingredients = list(ingredient_weights)
+        term_ids, report = self.query_terms(ingredients)
+        user_embedding = self.encode_query(self.vocabulary_matcher.text(term_ids))
+        indices, scores = self.search(user_embedding, max(top_n, HYBRID_SHORTLIST_SIZE), options, state)
+
+        weights = np.array([ingredient_weights[ingredient] for ingredient in ingredients], dtype=np.float64)
+        uses = np.zeros((len(indices), len(ingredients)))
+        for j, ingredient in enumerate(ingredients):
+            uses[:, j] = self.shortlist_coverage(state, indices, self.term_ids([ingredient]))[0] > 0
+        matched, missing = self.shortlist_coverage(state, indices, sorted(set(term_ids)))
+        combined = urgency_scores(
+            scores, uses, weights, missing,
+            HYBRID_SIMILARITY_WEIGHT, HYBRID_COVERAGE_WEIGHT, HYBRID_MISSING_PENALTY,
+        )
+        best = top_k_indices(combined, top_n)
+        return RankedSuggestions(
+            self, state, indices[best], scores[best], matched[best], missing[best], combined[best], query_terms=report,
+            limit=top_n, next_partition=lambda limit: self.suggest_urgent_ranked(ingredient_weights, limit, options, state),
+        )
+
+    @staticmethod
+    def shortlist_size(top_n: int, options: SuggestOptions) -> int:
+        return max(top_n, HYBRID_SHORTLIST_SIZE) if options.ranking == "hybrid" else top_n
+
+    def ranked(self, user_ingredients: list[str], indices: np.ndarray, scores: np.ndarray, top_n: int,
+               options: SuggestOptions, state: IndexState = None) -> RankedSuggestions:
+        state = state or self.state
+        if options.ranking != "hybrid":
+            # Sıra yalnızca benzerlikten gelir; eşleşen/eksik kalem sayıları yalnızca dönen satırlar için sayılır
+            indices, scores = indices[:top_n], scores[:top_n]
+            matched, missing = self.shortlist_coverage(state, indices, self.term_ids(user_ingredients))
+            return RankedSuggestions(self, state, indices, scores, matched, missing)
+
+        # Kısa liste, kullanıcının malzemeleriyle birebir kalem örtüşmesine göre yeniden puanlanır
+        matched, missing = self.shortlist_coverage(state, indices, self.term_ids(user_ingredients))
+        combined = hybrid_scores(
+            scores, matched, missing,
+            HYBRID_SIMILARITY_WEIGHT, HYBRID_COVERAGE_WEIGHT, HYBRID_MISSING_PENALTY,
+        )
+        best = top_k_indices(combined, top_n)
+        return RankedSuggestions(self, state, indices[best], scores[best], matched[best], missing[best], combined[best])
+
+    def shortlist_coverage(self, state: IndexState, indices: np.ndarray, term_ids: list[int]):
+        matched = np.zeros(len(indices), dtype=np.int64)
+        missing = np.zeros(len(indices), dtype=np.int64)
+        base = indices < len(self.titles)
+        for selection, ingredient_index, offset in (
+            (base, self.ingredient_index, 0),
+            (~base, state.delta.ingredient_index, len(self.titles)),
+        ):
+            if selection.any():
+                item_mask = ingredient_index.item_mask(term_ids)
+                matched[selection], missing[selection] = ingredient_index.shortlist_coverage(
+                    indices[selection] - offset, item_mask
+                )
+        return matched, missing
+
+    def query_terms(self, user_ingredients: list[str]):
+        """Kullanıcı terimlerini sözlük id'lerine eşler; (id'ler, eşlenen/atılan girdi raporu) döner."""
+        return self.vocabulary_matcher.map_inputs(
+            user_ingredients, lambda user_input: self.analyzer(clean_user_ingredients([user_input])[0])
+        )
+
+    def term_ids(self, user_ingredients: list[str]) -> list[int]:
+        return sorted(set(self.query_terms(user_ingredients)[0]))
+
+    def cook_now(self, user_ingredients: list[str], top_n: int = 10, max_missing: int = None,
+                 options: SuggestOptions = None, detail: bool = False):
+        """Eksik kalemi en az tarifler; (sonuçlar, eşlenen/atılan terim raporu) döner."""
+        state = self.state
+        options = (options or SuggestOptions()).resolved()
+        term_ids, report = self.query_terms(user_ingredients)
+        term_ids = sorted(set(term_ids))
+        base_matched_items = self.ingredient_index.matched_items(term_ids)
+        rows, matched, missing = self.ingredient_index.cook_now(
+            base_matched_items, top_n + state.base_tombstones, max_missing=max_missing,
+            row_mask=self.base_filter_mask(options) if options.filtered else None,
+        )
+        alive = state.base_alive[rows]
+        rows, matched, missing = rows[alive], matched[alive], missing[alive]
+
+        delta_matched_items = None
+        if len(state.delta):
+            delta_matched_items = state.delta.ingredient_index.matched_items(term_ids)
+            delta_rows, delta_matched, delta_missing = state.delta.ingredient_index.cook_now(
+                delta_matched_items, top_n, max_missing=max_missing,
+                row_mask=self.delta_filter_mask(state.delta, options) if options.filtered else None,
+            )
+            rows = np.concatenate([rows, delta_rows + len(self.titles)])
+            matched = np.concatenate([matched, delta_matched])
+            missing = np.concatenate([missing, delta_missing])
+        best = top_k_indices(cook_now_scores(matched, missing), top_n)
+
+        results = []
+        for row, matched_count, missing_count in zip(rows[best], matched[best], missing[best]):
+            recipe_id, title = self.recipe_summary(row, state)
+            if row < len(self.titles):
+                parsed = self.parsed_ingredients[row]
+                missing_positions = self.ingredient_index.missing_ingredients(row, base_matched_items)
+            else:
+                parsed = state.delta.parsed_ingredients[row - len(self.titles)]
+                missing_positions = state.delta.ingredient_index.missing_ingredients(
+                    row - len(self.titles), delta_matched_items
+                )
+            result = {
+                "id": recipe_id,
+                "title": title,
+                "matched_count": int(matched_count),
+                "missing_count": int(missing_count),
+                "coverage": round(float(matched_count) / max(matched_count + missing_count, 1), 4),
+                "missing_ingredients": [parsed[i] for i in missing_positions],
+            }
+            if detail:
+                result.update(parsed_ingredients=parsed, instructions=self.recipe_fields(row, state)[1])
+            results.append(result)
+        return results, report
+
+    # ------------------------
+    # SÜRÜM, METRİKLER VE YANITLAR
+    # ------------------------
+
+    @property
+    def version(self) -> str:
+        return f"{self.artifact.manifest['input_hash'][:16]}.{self.state.version}"
+
+    def suggestion_cache_key(self, ingredient_set: tuple, top_n: int, options: SuggestOptions = None):
+        return self.version, ingredient_set, top_n, (options or SuggestOptions()).resolved()
+
+    def metrics(self) -> dict:
+        state = self.state
+        return {
+            "version": self.version,
+            "recipe_count": len(self.titles) - state.base_tombstones + len(state.delta),
+            "delta_recipes": len(state.delta),
+            "tombstones": state.base_tombstones,
+            "embedding_precision": self.normalized_embeddings.precision,
+            "embedding_bytes": self.normalized_embeddings.nbytes,
+            "encoder_batching": self.encoder_batcher.metrics() if self.encoder_batcher else None,
+            "page_cache": suggestion_page_cache.stats(),
+        }
+
+    def recipe_fields(self, i: int, state: IndexState = None):
+        """(başlık, yapılış, parse edilmiş malzemeler); satır tabanda ya da delta segmentte olabilir."""
+        if i < len(self.titles):
+            return self.titles[i], self.instructions[i], self.parsed_ingredients[i]
+        state = state or self.state
+        row = i - len(self.titles)
+        delta = state.delta
+        return delta.recipes["title"].iat[row], delta.recipes["instructions"].iat[row], delta.parsed_ingredients[row]
+
+    def recipe_summary(self, i: int, state: IndexState = None):
+        """(tarif id'si, başlık); yapılış ve malzeme metinleri çözülmez."""
+        if i < len(self.titles):
+            return int(self.recipe_ids[i]), self.titles[i]
+        recipes = (state or self.state).delta.recipes
+        row = i - len(self.titles)
+        return int(recipes["id"].iat[row]), recipes["title"].iat[row]
+
+    def recipe_hit(self, i: int, score: float, state: IndexState = None, detail: bool = False) -> dict:
+        # Liste ekranı için kısa kayıt; tam tarif `GET /recipes/{id}` ile ayrıca alınır
+        recipe_id, title = self.recipe_summary(i, state)
+        hit = {"id": recipe_id, "title": title, "similarity": float(score)}
+        if detail:
+            _, instructions, parsed = self.recipe_fields(i, state)
+            hit.update(parsed_ingredients=parsed, instructions=instructions)
+        return hit
+
+
+# ------------------------
+# SÜREÇ GENELİ TEKİL INDEX
+# ------------------------
+
+_recipe_index = None
+_recipe_index_lock = threading.Lock()
+# Değişiklik uygulama ile sıkıştırma sonrası index değişimi birbirini beklemeli
+_recipe_changes_lock = threading.Lock()
+_compaction_thread = None
+_last_change_poll = 0.0
+# Sayfalama için sıralanmış listeler; index değişince temizlenmez, açık sayfalama oturumları kendi görüntüsünü korur
+suggestion_page_cache = TTLCache(max_size=PAGING_CACHE_SIZE, ttl_seconds=PAGING_CACHE_TTL_SECONDS)
+
+def get_recipe_index() -> RecipeIndex:
+    global _recipe_index
+    if _recipe_index is None:
+        with _recipe_index_lock:
+            if _recipe_index is None:
+                _recipe_index = RecipeIndex.open_bundle() if INDEX_STARTUP == "bundle" else RecipeIndex.build()
+    elif time.monotonic() - _last_change_poll >= CHANGE_POLL_SECONDS:
+        # Başka bir thread zaten yokluyorsa beklenmez; istek mevcut index'le devam eder
+        sync_recipe_changes(blocking=False)
+    return _recipe_index
+
+def _catch_up(index: RecipeIndex) -> bool:
+    """Index'e `recipe_changes`'taki yeni kayıtları uygular; delta'ya sığmayacak kadar çoksa False döner."""
+    first_version, changes = read_recipe_changes(index.change_version, DELTA_COMPACT_ROWS + 1, index.engine)
+    if not changes:
+        return True
+    # Geride kalınan aralık silinmişse ya da toplu yükleme gibi büyük bir değişiklikse index yeniden kurulmalı
+    if first_version > index.change_version + 1 or len(changes) > DELTA_COMPACT_ROWS:
+        return False
+    index.apply_change_log(changes)
+    return True
+
+def sync_recipe_changes(blocking: bool = True) -> RecipeIndex:
+    """Herhangi bir worker'ın DB'ye yazdığı tarif değişikliklerini bu süreçteki canlı index'e uygular.
+
+    Tarif yazan istekler yazdıktan sonra bunu bekleyerek çağırır (yazdığını hemen görür); diğer worker'lar
+    `get_recipe_index` içinde en fazla `CHANGE_POLL_SECONDS` aralıkla yoklar.
+    """
+    global _last_change_poll
+    if _recipe_index is None:
+        get_recipe_index()
+    if not _recipe_changes_lock.acquire(blocking=blocking):
+        return _recipe_index
+    try:
+        _last_change_poll = time.monotonic()
+        index = _recipe_index
+        caught_up = _catch_up(index)
+    finally:
+        _recipe_changes_lock.release()
+    if not caught_up or index.needs_compaction():
+        schedule_compaction()
+    return index
+
+def _swap_recipe_index(index: RecipeIndex):
+    global _recipe_index
+    with _recipe_changes_lock:
+        # Yeni index kurulurken yazılan değişiklikler, index devreye girmeden uygulanır
+        _catch_up(index)
+        with _recipe_index_lock:
+            previous, _recipe_index = _recipe_index, index
+    if previous is not None and previous is not index:
+        previous.close()
+        prune_artifacts(index.artifact.path.parent, index.artifact)
+
+def reload_recipe_index() -> RecipeIndex:
+    # Yeni index hazır olana kadar eskisi hizmet vermeye devam eder
+    index = RecipeIndex.build(reuse_from=_recipe_index)
+    _swap_recipe_index(index)
+    trim_recipe_changes(CHANGE_RETENTION_SECONDS, index.engine)
+    return index
+
+def schedule_compaction() -> bool:
+    global _compaction_thread
+    with _recipe_index_lock:
+        if _compaction_thread is not None and _compaction_thread.is_alive():
+            return False
+        # Sıkıştırma taban artifact'ı DB'den yeniden kurar; değişmeyen tarifler encode edilmez
+        _compaction_thread = threading.Thread(target=reload_recipe_index, name="recipe-compaction", daemon=True)
+        _compaction_thread.start()
+        return True
+
+
+# ------------------------
+# KOMUT SATIRI
+# ------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tarif motoru bundle'ını servisten bağımsız üretir.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Korpusu parse/encode edip bundle yazar ve CURRENT olarak yayınlar")
+    build.add_argument("--csv", type=Path, default=None, help="Korpus `recipes` tablosu yerine bu CSV'den okunur")
+    build.add_argument("--vocab-path", type=Path, default=VOCAB_PATH)
+    build.add_argument("--encoder-path", type=Path, default=ENCODER_PATH)
+    build.add_argument("--artifacts-dir", type=Path, default=ARTIFACTS_DIR)
+    build.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    build.add_argument("--workers", type=int, default=INGEST_WORKERS)
+
+    info = commands.add_parser("info", help="Yayınlanmış bundle'ın manifest'ini yazdırır")
+    info.add_argument("--artifacts-dir", type=Path, default=ARTIFACTS_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        artifact = open_current_bundle(args.artifacts_dir)
+        if artifact is None:
+            parser.exit(1, "Yayınlanmış bundle yok\n")
+        print(json.dumps({"path": str(artifact.path), **artifact.manifest}, ensure_ascii=False, indent=2))
+        return
+
+    with ExitStack() as stack:
+        if args.csv is not None:
+            # CSV bellekte tutulmaz: parçalar halinde geçici bir tabloya yazılıp tablodaki gibi id sırasıyla akar
+            engine = stack.enter_context(staged_recipes_csv(args.csv))
+        elif count_recipes() == 0:
+            parser.exit(1, "`recipes` tablosu boş; --csv verin ya da `python -m routers.recipe_loader` ile yükleyin\n")
+        else:
+            engine = default_engine
+        artifact, built = build_bundle(
+            partial(read_recipe_chunks, engine, chunk_size=args.chunk_size),
+            args.vocab_path, args.encoder_path, args.artifacts_dir, args.workers,
+        )
+    publish_bundle(args.artifacts_dir, artifact)
+    manifest = artifact.manifest
+    print(f"{'Üretildi' if built else 'Zaten mevcut'}: {artifact.path} ({manifest['recipe_count']} tarif, "
+          f"{manifest['encoded_count']} encode, {manifest.get('build_seconds', 0):.1f} sn) -> CURRENT")
+
+
+if __name__ == "__main__":
+    main()
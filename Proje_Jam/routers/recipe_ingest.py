@@ -0,0 +1,240 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ingredient_parser import parse_ingredients_bulk
+from .numpy_encoder import encode_bags
+from .recipe_artifact import (
+    ANN_N_LISTS,
+    ARTIFACT_FORMAT_VERSION,
+    ARTIFACTS_DIR,
+    ENCODER_PATH,
+    VOCAB_PATH,
+    ArtifactWriter,
+    RecipeArtifact,
+    compute_input_hash,
+    find_reusable_artifact,
+    load_encoder,
+    load_vectorizer,
+    text_hashes,
+)
+from .recipe_loader import corpus_chunk, read_recipe_chunks
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# Tek seferde okunan tarif sayısı; bellek kullanımını bu değer belirler
+INGEST_CHUNK_SIZE = int(os.getenv("RECIPE_INGEST_CHUNK_SIZE", "20000"))
+# Parse için süreç sayısı; 0 ise parse ana süreçte yapılır
+INGEST_WORKERS = int(os.getenv("RECIPE_INGEST_WORKERS", str(min(os.cpu_count() or 1, 8))))
+ENCODE_BATCH_SIZE = 4096
+
+
+# ------------------------
+# PARÇALI OKUMA VE PARSE
+# ------------------------
+
+def encode_texts(vectorizer, encoder, texts: list[str], batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
+    # Bag-of-ingredients matrisi CSR kalır; yoğun (satır x sözlük) matris hiç oluşturulmaz
+    return encode_bags(encoder, vectorizer.transform(texts), batch_size).astype(np.float32, copy=False)
+
+class EmbeddingReuse:
+    """Daha önce hesaplanmış embedding'leri encoder girdisi metnine göre yeniden kullanır.
+
+    Embedding yalnızca parse edilmiş malzeme metninin fonksiyonu olduğundan, metni değişmeyen tarif
+    (id'si veya korpustaki yeri değişse bile) tekrar encode edilmez. Kaynaklar metin hash'ine göre sıralı
+    dizilerle aranır; artifact'larda bu diziler diskte durur (mmap), korpus boyunda sözlük kurulmaz.
+    Hash çakışmasına karşı eşleşen satırın metni ayrıca karşılaştırılır.
+    """
+
+    def __init__(self):
+        self._sources = []
+
+    def add(self, parsed_ingredients, embeddings: np.ndarray, hashes: np.ndarray = None,
+            hash_rows: np.ndarray = None):
+        # Sıralı hash dizisi verilmezse (delta segment gibi küçük kaynaklar) burada hesaplanır
+        if hashes is None:
+            unsorted = text_hashes([" ".join(ingredients) for ingredients in parsed_ingredients])
+            hash_rows = np.argsort(unsorted, kind="stable")
+            hashes = unsorted[hash_rows]
+        self._sources.append((hashes, hash_rows, parsed_ingredients, embeddings))
+
+    def add_artifact(self, artifact: RecipeArtifact):
+        self.add(artifact.parsed_ingredients, artifact.embeddings, artifact.text_hashes, artifact.text_hash_rows)
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _, _, _ in self._sources)
+
+    def encode(self, vectorizer, encoder, texts: list[str]):
+        """Metinlerin embedding'lerini döner; yalnızca bilinmeyenler encoder'dan geçer. (embedding'ler, encode sayısı)"""
+        hashes = text_hashes(texts)
+        embeddings = np.empty((len(texts), self._sources[0][3].shape[1]), dtype=np.float32)
+        missing = np.arange(len(texts))
+        for source_hashes, source_rows, source_parsed, source_embeddings in self._sources:
+            if not len(missing) or not len(source_hashes):
+                continue
+            positions = np.minimum(np.searchsorted(source_hashes, hashes[missing]), len(source_hashes) - 1)
+            found = np.zeros(len(missing), dtype=bool)
+            for j in np.flatnonzero(source_hashes[positions] == hashes[missing]):
+                row = int(source_rows[positions[j]])
+                if " ".join(source_parsed[row]) == texts[missing[j]]:
+                    embeddings[missing[j]] = source_embeddings[row]
+                    found[j] = True
+            missing = missing[~found]
+        if len(missing):
+            embeddings[missing] = encode_texts(vectorizer, encoder, [texts[i] for i in missing])
+        return embeddings, len(missing)
+
+
+def frame_chunks(recipes: pd.DataFrame, chunk_size: int = INGEST_CHUNK_SIZE):
+    for start in range(0, len(recipes), chunk_size):
+        yield corpus_chunk(recipes.iloc[start:start + chunk_size])
+
+def parse_chunks(chunks, workers: int = INGEST_WORKERS):
+    """`corpus_chunk` parçalarındaki malzemeleri parse eder; (id'ler, parse edilmiş malzemeler, *diğer kolonlar)
+    parçalarını korpus sırasıyla üretir.
+
+    Parse süreç havuzunda yapılır; aynı anda en fazla `2 * workers` parça bekletilir, böylece
+    okuma encode'dan hızlı olsa bile bellek sınırlı kalır.
+    """
+    if workers <= 0:
+        for recipe_ids, ingredient_strs, *fields in chunks:
+            yield recipe_ids, parse_ingredients_bulk(ingredient_strs), *fields
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for recipe_ids, ingredient_strs, *fields in chunks:
+            pending.append((recipe_ids, executor.submit(parse_ingredients_bulk, ingredient_strs), fields))
+            if len(pending) >= 2 * workers:
+                recipe_ids, future, fields = pending.popleft()
+                yield recipe_ids, future.result(), *fields
+        while pending:
+            recipe_ids, future, fields = pending.popleft()
+            yield recipe_ids, future.result(), *fields
+
+
+# ------------------------
+# INGEST
+# ------------------------
+
+def ingest(chunks, artifact_path: Path, vectorizer, encoder, input_hash: str, model_hash: str = None,
+           workers: int = INGEST_WORKERS, n_lists: int = ANN_N_LISTS, reuse: EmbeddingReuse = None) -> RecipeArtifact:
+    """`corpus_chunk` parçalarını parse eder, encode eder ve artifact'a akıtır.
+
+    Korpusun tamamı hiçbir aşamada belleğe alınmaz; embedding'ler ve ters index doğrudan diske yazılır.
+    `reuse` verilirse metni bilinen tarifler encode edilmeden kopyalanır.
+    """
+    started = time.perf_counter()
+    encoded_count = 0
+    # Aşama süreleri manifest'e yazılır; okuma+parse, parse havuzunu bekleme süresini de içerir
+    timings = {"read_parse_seconds": 0.0, "encode_seconds": 0.0, "write_seconds": 0.0}
+    writer = ArtifactWriter(Path(artifact_path), vectorizer, n_lists=n_lists)
+    try:
+        parsed_chunks = parse_chunks(chunks, workers)
+        while True:
+            mark = time.perf_counter()
+            chunk = next(parsed_chunks, None)
+            timings["read_parse_seconds"] += time.perf_counter() - mark
+            if chunk is None:
+                break
+            recipe_ids, parsed_ingredients, *fields = chunk
+
+            mark = time.perf_counter()
+            texts = [" ".join(ings) for ings in parsed_ingredients]
+            if reuse:
+                embeddings, encoded = reuse.encode(vectorizer, encoder, texts)
+            else:
+                embeddings, encoded = encode_texts(vectorizer, encoder, texts), len(texts)
+            encoded_count += encoded
+            timings["encode_seconds"] += time.perf_counter() - mark
+
+            mark = time.perf_counter()
+            writer.append(recipe_ids, parsed_ingredients, embeddings, *fields)
+            timings["write_seconds"] += time.perf_counter() - mark
+        if writer.recipe_count == 0:
+            raise ValueError("Korpusta tarif bulunamadı")
+        manifest = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "input_hash": input_hash,
+            "model_hash": model_hash,
+            "recipe_count": writer.recipe_count,
+            "encoded_count": encoded_count,
+            "embedding_dim": int(writer.embeddings.row_shape[0]),
+            "vocabulary_size": len(vectorizer.vocabulary),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+        }
+        return writer.close(manifest, started)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def build_bundle(read_chunks, vocab_path=VOCAB_PATH, encoder_path=ENCODER_PATH, artifacts_dir=ARTIFACTS_DIR,
+                 workers: int = INGEST_WORKERS, reuse: EmbeddingReuse = None):
+    """Korpustan artifact üretir; (artifact, yeni mi üretildi) döner.
+
+    `read_chunks` her çağrıda korpusun `corpus_chunk` parçalarını baştan üreten fonksiyondur: korpus bir kez
+    anahtar için hash'lenir, artifact yoksa bir kez de ingest için okunur. Anahtar servisin `RecipeIndex.build`
+    ile bulacağı klasörle aynıdır. `reuse` verilmezse aynı modelle üretilmiş en yeni artifact kullanılır.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    input_hash = compute_input_hash([vocab_path, encoder_path], read_chunks())
+    artifact_path = artifacts_dir / input_hash[:16]
+    artifact = RecipeArtifact.open(artifact_path)
+    if artifact is not None:
+        return artifact, False
+
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    model_hash = compute_input_hash([vocab_path, encoder_path])
+    if reuse is None:
+        previous = find_reusable_artifact(artifacts_dir, model_hash)
+        if previous is not None:
+            reuse = EmbeddingReuse()
+            reuse.add_artifact(previous)
+
+    artifact = ingest(
+        read_chunks(), artifact_path, load_vectorizer(vocab_path), load_encoder(encoder_path), input_hash,
+        model_hash=model_hash, workers=workers, reuse=reuse,
+    )
+    return artifact, True
+
+
+# ------------------------
+# KOMUT SATIRI
+# ------------------------
+
+def main(argv=None):
+    # Büyük döküm önce `python -m routers.recipe_loader dump.csv` ile tabloya yüklenir
+    parser = argparse.ArgumentParser(description="`recipes` tablosundan embedding artifact'ı üretir.")
+    parser.add_argument("--vocab-path", type=Path, default=VOCAB_PATH)
+    parser.add_argument("--encoder-path", type=Path, default=ENCODER_PATH)
+    parser.add_argument("--artifacts-dir", type=Path, default=ARTIFACTS_DIR)
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    artifact, built = build_bundle(
+        lambda: read_recipe_chunks(chunk_size=args.chunk_size), args.vocab_path, args.encoder_path,
+        args.artifacts_dir, workers=args.workers,
+    )
+    if not built:
+        print(f"Artifact zaten mevcut: {artifact.path}")
+        return
+    seconds = time.perf_counter() - started
+    print(f"{artifact.manifest['recipe_count']} tarif ({artifact.manifest['encoded_count']} encode) "
+          f"{seconds:.1f} sn'de işlendi ({artifact.manifest['recipe_count'] / seconds:.0f} tarif/sn): {artifact.path}")
+
+
+if __name__ == "__main__":
+    main()
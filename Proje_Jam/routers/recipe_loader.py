@@ -0,0 +1,233 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine, delete, func, select
+
+from app.database import engine as default_engine
+from app.models import Recipe, RecipeChange
+
+from .ingredient_parser import normalize_turkish_chars, turkish_lower
+from .recipe_artifact import RECIPES_CSV_PATH
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# Tek transaction'da `executemany` ile yazılan satır sayısı
+RECIPE_LOAD_BATCH_SIZE = int(os.getenv("RECIPE_LOAD_BATCH_SIZE", "50000"))
+
+# Aynı id tekrar yüklenirse satır güncellenir; yükleme tekrar çalıştırılabilir. `INSERT OR REPLACE`
+# silme tetikleyicilerini çalıştırmadığı için UPSERT kullanılır (arama index'i tetikleyicilerle güncellenir).
+_INSERT_SQL = (
+    "INSERT INTO recipes (id, yemek, mutfagi, sure_min, sure, malzeme, yapilisi) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET yemek = excluded.yemek, mutfagi = excluded.mutfagi, sure_min = excluded.sure_min, "
+    "sure = excluded.sure, malzeme = excluded.malzeme, yapilisi = excluded.yapilisi"
+)
+_DURATION_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*(saat)?", re.IGNORECASE)
+_CUISINE_SUFFIX = re.compile(r"\s*\(.*\)\s*$")
+# Aynı mutfağın sıfat/ülke adıyla yazılmış etiketleri tek koda toplanır
+_CUISINE_ALIASES = {"fransiz": "fransa", "italyan": "italya", "ispanyol": "ispanya"}
+
+# Tarif motoru DB kolonlarını CSV'deki adlarla kullanır
+_COLUMNS = {
+    "id": Recipe.id,
+    "title": Recipe.yemek,
+    "cuisine": Recipe.mutfagi,
+    "duration_min": Recipe.sure_min,
+    "duration": Recipe.sure,
+    "ingredients": Recipe.malzeme,
+    "instructions": Recipe.yapilisi,
+}
+RECIPE_COLUMNS = list(_COLUMNS)
+# CSV'de süre tek etiket kolonudur ("20-40 dk"); en az/en fazla dakika ondan ayrıştırılır
+_CSV_COLUMNS = [name for name in RECIPE_COLUMNS if name != "duration_min"]
+
+
+# ------------------------
+# CSV -> DB
+# ------------------------
+
+def parse_duration_range(label):
+    """Süre etiketini (en az, en fazla) dakikaya çevirir: "20-40 dk" -> (20, 40), "1,5saat" -> (90, 90).
+
+    Açık uçlu sürenin üst sınırı yoktur: "60 dk-Fazla" -> (60, None). Okunamayan süre (None, None) döner.
+    """
+    if not isinstance(label, str):
+        return None, None
+    minutes = [
+        round(float(value.replace(",", ".")) * (60 if hours else 1))
+        for value, hours in _DURATION_PATTERN.findall(label)
+    ]
+    if not minutes:
+        return None, None
+    return min(minutes), None if "fazla" in label.lower() else max(minutes)
+
+def cuisine_key(label) -> str:
+    """Mutfak etiketini filtre anahtarına çevirir: "Fransız" -> "fransa", "Türk (Antep)" -> "turk"; boş -> ""."""
+    if not isinstance(label, str):
+        return ""
+    key = normalize_turkish_chars(turkish_lower(_CUISINE_SUFFIX.sub("", label))).strip()
+    return _CUISINE_ALIASES.get(key, key)
+
+def _none_if_missing(value):
+    return None if pd.isna(value) else value
+
+def load_recipes_csv(engine=default_engine, csv_path=RECIPES_CSV_PATH,
+                     batch_size: int = RECIPE_LOAD_BATCH_SIZE) -> int:
+    """CSV'yi parçalar halinde okuyup `recipes` tablosuna yazar; yazılan satır sayısını döner.
+
+    Her parça tek transaction'da tek `executemany` çağrısıyla yazılır; ORM nesnesi oluşturulmaz.
+    """
+    loaded = 0
+    for chunk in pd.read_csv(csv_path, sep=";", encoding="utf-8-sig", chunksize=batch_size):
+        rows = [
+            (int(recipe_id), title, _none_if_missing(cuisine), *parse_duration_range(duration),
+             "" if pd.isna(ingredients) else str(ingredients), "" if pd.isna(instructions) else instructions)
+            for recipe_id, title, cuisine, duration, ingredients, instructions in zip(
+                chunk["id"], chunk["title"], chunk["cuisine"], chunk["duration"],
+                chunk["ingredients"], chunk["instructions"],
+            )
+        ]
+        with engine.begin() as conn:
+            conn.exec_driver_sql(_INSERT_SQL, rows)
+        loaded += len(rows)
+    return loaded
+
+def count_recipes(engine=default_engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Recipe.__table__)).scalar_one()
+
+def ensure_recipes_loaded(engine=default_engine, csv_path=RECIPES_CSV_PATH) -> int:
+    # Boş veritabanıyla ilk açılışta tablo CSV'den doldurulur; sonrasında CSV'ye ihtiyaç kalmaz
+    if count_recipes(engine) == 0 and os.path.exists(csv_path):
+        return load_recipes_csv(engine, csv_path)
+    return 0
+
+
+# ------------------------
+# DB -> TARİF MOTORU
+# ------------------------
+
+def _recipes_query():
+    return select(*(column.label(name) for name, column in _COLUMNS.items())).order_by(Recipe.id)
+
+def _fill_text_columns(recipes: pd.DataFrame) -> pd.DataFrame:
+    recipes["title"] = recipes["title"].fillna("")
+    recipes["ingredients"] = recipes["ingredients"].fillna("")
+    recipes["instructions"] = recipes["instructions"].fillna("")
+    return recipes
+
+def read_recipes(engine=default_engine) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return _fill_text_columns(pd.read_sql(_recipes_query(), conn))
+
+def read_recipes_by_ids(recipe_ids, engine=default_engine) -> pd.DataFrame:
+    # Silinmiş id'ler sonuçta yer almaz
+    with engine.connect() as conn:
+        return _fill_text_columns(pd.read_sql(_recipes_query().where(Recipe.id.in_(list(recipe_ids))), conn))
+
+def read_recipes_csv(csv_path=RECIPES_CSV_PATH) -> pd.DataFrame:
+    """CSV'yi DB'ye yazmadan tarif motoru kolonlarıyla okur; satırlar DB okumasındaki gibi id'ye göre sıralanır.
+
+    Aynı içerik CSV'den ve tablodan okunduğunda aynı artifact anahtarını üretir.
+    """
+    recipes = pd.read_csv(csv_path, sep=";", encoding="utf-8-sig", usecols=_CSV_COLUMNS)
+    durations = [parse_duration_range(label) for label in recipes["duration"]]
+    recipes["duration_min"] = pd.array([low for low, _ in durations], dtype="Int64")
+    recipes["duration"] = pd.array([high for _, high in durations], dtype="Int64")
+    recipes["cuisine"] = [_none_if_missing(label) for label in recipes["cuisine"]]
+    return _fill_text_columns(recipes.sort_values("id", kind="stable").reset_index(drop=True)[RECIPE_COLUMNS])
+
+@contextmanager
+def staged_recipes_csv(csv_path=RECIPES_CSV_PATH, batch_size: int = RECIPE_LOAD_BATCH_SIZE):
+    """CSV'yi geçici bir SQLite dosyasındaki `recipes` tablosuna parçalar halinde yükler ve o engine'i verir.
+
+    CSV id sırasında değildir; id sırası bellekte sıralamak yerine tablonun birincil anahtarından okunur, böylece
+    korpus `read_recipe_chunks` ile tablodan okunur gibi akar ve aynı artifact anahtarını üretir.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'recipes.db'}")
+        try:
+            Recipe.__table__.create(engine)
+            load_recipes_csv(engine, csv_path, batch_size)
+            yield engine
+        finally:
+            engine.dispose()
+
+def corpus_chunk(recipes: pd.DataFrame):
+    """Artifact'a giren kolonlar: (id'ler, malzeme metinleri, başlıklar, yapılışlar, mutfak anahtarları,
+    en fazla süre dakika, en az süre dakika; bilinmiyorsa ya da açık uçluysa -1)."""
+    return (
+        recipes["id"].to_numpy(dtype="int64"),
+        recipes["ingredients"].astype(str).tolist(),
+        recipes["title"].astype(str).tolist(),
+        recipes["instructions"].astype(str).tolist(),
+        [cuisine_key(label) for label in recipes["cuisine"]],
+        [-1 if pd.isna(minutes) else int(minutes) for minutes in recipes["duration"]],
+        [-1 if pd.isna(minutes) else int(minutes) for minutes in recipes["duration_min"]],
+    )
+
+def read_recipe_chunks(engine=default_engine, chunk_size: int = RECIPE_LOAD_BATCH_SIZE):
+    """`corpus_chunk` parçaları; ingest hattı korpusu belleğe almadan DB'den okur."""
+    with engine.connect() as conn:
+        for chunk in pd.read_sql(_recipes_query(), conn, chunksize=chunk_size):
+            yield corpus_chunk(_fill_text_columns(chunk))
+
+
+# ------------------------
+# DEĞİŞİKLİK GÜNLÜĞÜ (`recipe_changes`)
+# ------------------------
+
+def read_change_version(engine=default_engine) -> int:
+    """Son kaydedilen değişikliğin sürümü; index korpusu okumadan önce bunu alır."""
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(RecipeChange.version), 0))).scalar_one()
+
+def read_recipe_changes(after: int, limit: int, engine=default_engine):
+    """(tablodaki en eski sürüm, [(sürüm, tarif id'si), ...]); yalnızca `after`'dan sonraki en fazla `limit` değişiklik."""
+    with engine.connect() as conn:
+        first_version = conn.execute(select(func.min(RecipeChange.version))).scalar_one()
+        changes = conn.execute(
+            select(RecipeChange.version, RecipeChange.recipe_id)
+            .where(RecipeChange.version > after)
+            .order_by(RecipeChange.version)
+            .limit(limit)
+        ).all()
+    return first_version, changes
+
+def trim_recipe_changes(retention_seconds: float, engine=default_engine) -> int:
+    # En son kayıt hep kalır; geride kalmış bir worker silinen aralığı bu sayede fark edip index'i yeniden kurar
+    latest = select(func.max(RecipeChange.version)).scalar_subquery()
+    with engine.begin() as conn:
+        return conn.execute(
+            delete(RecipeChange).where(
+                RecipeChange.changed_at < func.datetime("now", f"-{int(retention_seconds)} seconds"),
+                RecipeChange.version < latest,
+            )
+        ).rowcount
+
+
+# ------------------------
+# KOMUT SATIRI
+# ------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tarif CSV'sini `recipes` tablosuna toplu yükler.")
+    parser.add_argument("csv_path", nargs="?", default=RECIPES_CSV_PATH)
+    parser.add_argument("--batch-size", type=int, default=RECIPE_LOAD_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    loaded = load_recipes_csv(default_engine, args.csv_path, batch_size=args.batch_size)
+    seconds = time.perf_counter() - started
+    print(f"{loaded} tarif {seconds:.2f} sn'de yüklendi ({loaded / max(seconds, 1e-9):.0f} satır/sn)")
+
+
+if __name__ == "__main__":
+    main()
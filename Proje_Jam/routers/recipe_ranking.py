@@ -0,0 +1,73 @@
+import numpy as np
+
+from .quantization import embedding_scores
+
+# ------------------------
+# NORMALİZASYON
+# ------------------------
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Satırları birim uzunluğa getirir; sıfır vektörler sıfır kalır (sklearn cosine_similarity ile aynı)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ------------------------
+# TOP-K SEÇİMİ
+# ------------------------
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """En yüksek k skorun indekslerini azalan sırada döner; eşit skorlarda küçük indeks öne geçer.
+
+    Tam sıralama yerine `partition` ile O(N) aday seçilir, yalnızca k eleman sıralanır. Sınırdaki eşit skorlardan
+    hangilerinin alınacağı da indekse göre belirlenir; böylece k büyüdükçe sonuç öncekinin devamı olur.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        candidates = np.concatenate([above, np.flatnonzero(scores == kth)[:k - len(above)]])
+    else:
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def top_k_cosine_batch(normalized_embeddings, query_embeddings: np.ndarray, k: int):
+    """Birden çok sorgu için tek matris-matris çarpımıyla tam top-k araması.
+
+    Matris düz float32 dizi ya da nicelenmiş (float16/int8) matris olabilir.
+    Her sorgu için (indeksler, skorlar) çiftlerinin listesini döner.
+    """
+    queries = l2_normalize(query_embeddings)
+    scores = embedding_scores(normalized_embeddings, queries)
+    # Seçim satır başına yapılır ki eşitlik kuralı tek sorguluk aramayla aynı olsun
+    results = []
+    for row_scores in scores:
+        indices = top_k_indices(row_scores, k)
+        results.append((indices, row_scores[indices]))
+    return results
+
+
+# ------------------------
+# HİBRİT YENİDEN SIRALAMA
+# ------------------------
+
+def hybrid_scores(similarities: np.ndarray, matched: np.ndarray, missing: np.ndarray,
+                  similarity_weight: float, coverage_weight: float, missing_penalty: float) -> np.ndarray:
+    """Embedding benzerliğini malzeme kapsamasıyla birleştirir; kısa liste üzerinde vektörel çalışır."""
+    coverage = matched / np.maximum(matched + missing, 1)
+    return similarity_weight * similarities + coverage_weight * coverage - missing_penalty * missing
+
+def urgency_scores(similarities: np.ndarray, uses: np.ndarray, weights: np.ndarray, missing: np.ndarray,
+                   similarity_weight: float, coverage_weight: float, missing_penalty: float) -> np.ndarray:
+    """Hibrit puanın aciliyet ağırlıklı hali: kapsama, tarifin kullandığı malzemelerin aciliyet payıdır.
+
+    `uses` (aday x malzeme) tarifin o malzemeyi içerip içermediği, `weights` malzeme başına aciliyettir.
+    """
+    coverage = uses @ weights / max(float(weights.sum()), 1e-9)
+    return similarity_weight * similarities + coverage_weight * coverage - missing_penalty * missing
@@ -0,0 +1,59 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .ingredient_parser import normalize_turkish_chars, strip_combining_marks, turkish_lower
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# bm25 kolon ağırlıkları: başlık eşleşmesi malzemeden, malzeme de yapılıştan değerlidir
+TITLE_WEIGHT = 10.0
+INGREDIENTS_WEIGHT = 3.0
+INSTRUCTIONS_WEIGHT = 1.0
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_SEARCH_SQL = text(
+    "SELECT r.id, r.yemek, r.mutfagi, r.sure_min, r.sure, "
+    f"bm25(recipes_fts, {TITLE_WEIGHT}, {INGREDIENTS_WEIGHT}, {INSTRUCTIONS_WEIGHT}) AS rank "
+    "FROM recipes_fts JOIN recipes r ON r.id = recipes_fts.rowid "
+    "WHERE recipes_fts MATCH :query "
+    "ORDER BY rank LIMIT :limit"
+)
+
+
+# ------------------------
+# FTS5 ARAMA
+# ------------------------
+
+def build_match_query(query: str):
+    """Kullanıcı metnini FTS5 MATCH ifadesine çevirir: "Fırında merc" -> '"firinda"* "merc"*'.
+
+    Harfler index'tekiyle aynı şekilde sadeleştirilir ("İçli" -> "icli"); her kelime tırnak içinde önek araması
+    olur, böylece FTS5 operatörleri (OR, NEAR, -) kullanıcı girdisinden yorumlanmaz. Kelimeler VE ile bağlanır.
+    """
+    tokens = _TOKEN_PATTERN.findall(strip_combining_marks(normalize_turkish_chars(turkish_lower(query))))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def search_recipes(db: Session, query: str, limit: int = 20) -> list[dict]:
+    match_query = build_match_query(query)
+    if match_query is None:
+        return []
+    rows = db.execute(_SEARCH_SQL, {"query": match_query, "limit": limit})
+    return [
+        {
+            "id": recipe_id,
+            "title": title,
+            "cuisine": cuisine,
+            "duration_min": duration_min,
+            "duration": duration,
+            # bm25 küçük oldukça iyidir; yanıtta büyük = iyi olacak şekilde çevrilir
+            "score": round(-rank, 4),
+        }
+        for recipe_id, title, cuisine, duration_min, duration, rank in rows
+    ]
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import User
+from .auth import get_current_user
+from .crud import create_recipe, delete_recipe, get_recipe_detail, update_recipe
+from .recipe_search import search_recipes
+
+# Tek aramada döndürülebilecek en fazla tarif sayısı
+MAX_RECIPE_SEARCH_LIMIT = 100
+# Tarif detayı istemcide/proxy'de bu kadar saniye önbelleklenir; sonra ETag ile doğrulanır (tarif düzenlenebilir)
+RECIPE_DETAIL_MAX_AGE_SECONDS = int(os.getenv("RECIPE_DETAIL_MAX_AGE_SECONDS", "300"))
+
+router = APIRouter(
+    prefix="/recipes",
+    tags=["Recipes"],
+)
+
+# --------------------------
+# MODELLER
+# --------------------------
+class RecipeWrite(BaseModel):
+    title: str
+    cuisine: Optional[str] = None
+    duration: Optional[int] = None  # dakika; aralıklı tarifte en fazla süre
+    duration_min: Optional[int] = None  # boş bırakılırsa `duration` ile aynı kabul edilir
+    ingredients: str  # virgülle ayrılmış ham malzeme metni
+    instructions: str = ""
+
+# --------------------------
+# DATABASE SESSION
+# --------------------------
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# --------------------------
+# ARAMA - Başlık, Malzeme ve Yapılışta Tam Metin Arama
+# --------------------------
+@router.get("/search")
+def search(q: str, limit: int = 20, db: Session = Depends(get_db)):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Arama ifadesi boş olamaz.")
+    if not 1 <= limit <= MAX_RECIPE_SEARCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit 1 ile {MAX_RECIPE_SEARCH_LIMIT} arasında olmalıdır.")
+
+    try:
+        return {"query": q, "recipes": search_recipes(db, q, limit=limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Tarif araması yapılamadı: {str(e)}")
+
+# --------------------------
+# DETAY - Önerilerde Yalnızca Id/Başlık Döner, Tam Tarif Buradan Alınır
+# --------------------------
+@router.get("/{recipe_id}")
+def read_recipe(recipe_id: int, response: Response, if_none_match: Optional[str] = Header(None),
+                db: Session = Depends(get_db)):
+    recipe = get_recipe_detail(db, recipe_id)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Tarif bulunamadı.")
+
+    etag = '"' + hashlib.sha256(json.dumps(recipe, ensure_ascii=False).encode()).hexdigest()[:16] + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={RECIPE_DETAIL_MAX_AGE_SECONDS}"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return recipe
+
+# --------------------------
+# CREATE / UPDATE / DELETE - Tarif (Öneri Index'i Yeniden Kurulmadan Güncellenir)
+# --------------------------
+def _recipe_response(db_recipe, index_version: str) -> dict:
+    return {"id": db_recipe.id, "title": db_recipe.yemek, "index_version": index_version}
+
+@router.post("/")
+def create_new_recipe(recipe: RecipeWrite, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    db_recipe, index_version = create_recipe(
+        db, recipe.title, recipe.cuisine, recipe.duration, recipe.ingredients, recipe.instructions,
+        duration_min=recipe.duration_min,
+    )
+    return _recipe_response(db_recipe, index_version)
+
+@router.put("/{recipe_id}")
+def update_existing_recipe(recipe_id: int, recipe: RecipeWrite, db: Session = Depends(get_db),
+                           current_user: User = Depends(get_current_user)):
+    db_recipe, index_version = update_recipe(
+        db, recipe_id, recipe.title, recipe.cuisine, recipe.duration, recipe.ingredients, recipe.instructions,
+        duration_min=recipe.duration_min,
+    )
+    if not db_recipe:
+        raise HTTPException(status_code=404, detail="Tarif bulunamadı.")
+    return _recipe_response(db_recipe, index_version)
+
+@router.delete("/{recipe_id}")
+def delete_existing_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    db_recipe, index_version = delete_recipe(db, recipe_id)
+    if not db_recipe:
+        raise HTTPException(status_code=404, detail="Tarif bulunamadı.")
+    return _recipe_response(db_recipe, index_version)
@@ -0,0 +1,166 @@
+import sys
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from .ingredient_parser import normalize_turkish_chars, strip_combining_marks, turkish_lower
+
+# ------------------------
+# AYARLAR
+# ------------------------
+
+# Terim uzunluğuna göre izin verilen en fazla düzenleme: kısa terimlerde yazım hatası eşleşmesi yapılmaz
+FUZZY_MIN_LENGTH = 4
+FUZZY_TWO_EDITS_MIN_LENGTH = 8
+MATCH_CACHE_SIZE = 16_384
+# Eşleşme türleri sıkıdan gevşeğe; raporda bir girdinin türü token'larının en gevşeğidir
+MATCH_KINDS = ("exact", "folded", "fuzzy")
+
+
+def fold(term: str) -> str:
+    """Büyük/küçük harf ve Türkçe karakter farkını yok sayan anahtar: "Soğan" -> "sogan", "İsot" -> "isot"."""
+    return strip_combining_marks(normalize_turkish_chars(turkish_lower(term)))
+
+def _trigrams(term: str) -> set:
+    padded = f"$${term}$$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_edits(term: str) -> int:
+    if len(term) < FUZZY_MIN_LENGTH:
+        return 0
+    return 2 if len(term) >= FUZZY_TWO_EDITS_MIN_LENGTH else 1
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Yer değiştirme dahil (optimal string alignment) düzenleme mesafesi; `limit` aşılınca `limit + 1` döner."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+# ------------------------
+# SÖZLÜK EŞLEYİCİ
+# ------------------------
+
+class VocabularyMatcher:
+    """Kullanıcı terimlerini encoder sözlüğündeki terim id'lerine eşler.
+
+    Sırasıyla denenir: birebir eşleşme, harf/Türkçe karakter katlanmış eşleşme ("sogan" -> "soğan"),
+    trigram adaylarından sınırlı düzenleme mesafesiyle eşleşme ("domatess" -> "domates"). Aynı anahtara
+    birden çok sözlük terimi düşerse korpusta en sık geçen seçilir. Sonuçlar terim başına önbelleklenir.
+    """
+
+    def __init__(self, vocabulary: dict, term_frequencies: np.ndarray = None):
+        self.vocabulary = vocabulary
+        self.terms = np.empty(len(vocabulary), dtype=object)
+        for term, term_id in vocabulary.items():
+            self.terms[term_id] = term
+        frequencies = np.zeros(len(vocabulary)) if term_frequencies is None else np.asarray(term_frequencies)
+
+        # Katlanmış anahtar -> en sık sözlük terimi
+        folded = {}
+        for term_id, term in enumerate(self.terms):
+            key = fold(term)
+            if key not in folded or frequencies[term_id] > frequencies[folded[key]]:
+                folded[key] = term_id
+        self.folded = folded
+        self.folded_keys = list(folded)
+        self.folded_ids = np.fromiter(folded.values(), dtype=np.int64, count=len(folded))
+        self.folded_frequencies = frequencies[self.folded_ids]
+
+        # Trigram -> katlanmış anahtar sıraları (ters index)
+        postings = defaultdict(list)
+        for position, key in enumerate(self.folded_keys):
+            for trigram in _trigrams(key):
+                postings[trigram].append(position)
+        self.trigram_postings = {trigram: np.asarray(keys, dtype=np.int32) for trigram, keys in postings.items()}
+
+        self.match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def _match(self, token: str):
+        """(terim id'si, eşleşme türü) döner; eşleşme yoksa (None, None)."""
+        term_id = self.vocabulary.get(token)
+        if term_id is not None:
+            return term_id, "exact"
+        key = fold(token)
+        term_id = self.folded.get(key)
+        if term_id is not None:
+            return term_id, "folded"
+        term_id = self._fuzzy(key)
+        if term_id is not None:
+            return term_id, "fuzzy"
+        return None, None
+
+    def _fuzzy(self, key: str):
+        limit = max_edits(key)
+        if limit == 0:
+            return None
+        grams = [self.trigram_postings[g] for g in _trigrams(key) if g in self.trigram_postings]
+        if not grams:
+            return None
+        # q-gram lemması: `limit` düzenleme en fazla 3 * limit trigramı bozar
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.folded_keys))
+        candidates = np.flatnonzero(shared >= max(len(key) + 2 - 3 * limit, 1))
+
+        best = None
+        for position in candidates[np.argsort(-shared[candidates], kind="stable")]:
+            distance = bounded_edit_distance(key, self.folded_keys[position], limit)
+            if distance > limit:
+                continue
+            rank = (distance, -self.folded_frequencies[position])
+            if best is None or rank < best[0]:
+                best = rank, position
+        return int(self.folded_ids[best[1]]) if best is not None else None
+
+    def map_inputs(self, inputs: list[str], tokenize):
+        """Kullanıcı girdilerini eşler; (sözlük terim id'leri, rapor) döner.
+
+        `tokenize` bir girdiyi eşlenecek token'lara böler. Rapor kullanıcının yazdığı girdilere göre tutulur:
+        her girdi çözüldüğü sözlük terim(ler)iyle "mapped"e, hiçbir token'ı eşlenemeyen girdi "dropped"a yazılır.
+        """
+        term_ids = []
+        mapped, dropped, seen = [], [], set()
+        for user_input in inputs:
+            matches = [self.match(token) for token in tokenize(user_input)]
+            input_ids = [term_id for term_id, _ in matches if term_id is not None]
+            term_ids.extend(input_ids)
+            if user_input in seen:
+                continue
+            seen.add(user_input)
+            if not input_ids:
+                dropped.append(user_input)
+                continue
+            kind = max((kind for term_id, kind in matches if term_id is not None), key=MATCH_KINDS.index)
+            mapped.append({"input": user_input, "term": self.text(input_ids), "match": kind})
+        return term_ids, {"mapped": mapped, "dropped": dropped}
+
+    def text(self, term_ids) -> str:
+        # Vektörleştiriciye sözlük terimleri verilir; her terim analyzer'dan aynen geçer
+        return " ".join(self.terms[term_id] for term_id in term_ids)
+
+
+if __name__ == "__main__":
+    from routers.recipe_artifact import load_vectorizer
+
+    matcher = VocabularyMatcher(load_vectorizer().vocabulary)
+    queries = sys.argv[1:] or ["sogan", "domatess", "SOĞAN", "kıyma", "zeytinyagi", "pirnç", "xyzq"]
+    for query in queries:
+        print(query, "->", matcher.match(query))
+
+    started = time.perf_counter()
+    for query in queries:
+        matcher._match(query)
+    print(f"önbelleksiz: {(time.perf_counter() - started) / len(queries) * 1e6:.1f} µs/terim")
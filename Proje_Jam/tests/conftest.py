@@ -0,0 +1,42 @@
+import pytest
+
+from routers.recipe_artifact import load_encoder, load_vectorizer
+from routers.recipe_index import RecipeIndex
+from routers.recipe_ingest import frame_chunks, ingest
+from routers.recipe_loader import read_recipes_csv
+
+# Testler korpusun bu kadar tarifiyle çalışır; artifact her testte geçici klasöre yeniden yazılır
+CORPUS_SIZE = 300
+
+
+@pytest.fixture(scope="session")
+def vectorizer():
+    return load_vectorizer()
+
+@pytest.fixture(scope="session")
+def encoder():
+    return load_encoder()
+
+@pytest.fixture(scope="session")
+def corpus():
+    return read_recipes_csv().head(CORPUS_SIZE).reset_index(drop=True)
+
+@pytest.fixture
+def build_index(tmp_path, vectorizer, encoder):
+    """Verilen tariflerden DB'siz bir `RecipeIndex` kurar; artifact `tmp_path` altına yazılır."""
+    indexes = []
+
+    def build(recipes, name="artifact"):
+        artifact = ingest(frame_chunks(recipes, 64), tmp_path / name, vectorizer, encoder, name, workers=0)
+        index = RecipeIndex(vectorizer, encoder)
+        index.attach_artifact(artifact)
+        indexes.append(index)
+        return index
+
+    yield build
+    for index in indexes:
+        index.close()
+
+@pytest.fixture
+def recipe_index(build_index, corpus):
+    return build_index(corpus)
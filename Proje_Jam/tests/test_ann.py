@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from routers.products import IngredientRequest
+from routers.recipe_index import ANN_N_PROBE, SuggestOptions
+
+QUERY = ["domates", "soğan", "biber"]
+
+
+def _query(recipe_index):
+    return recipe_index.normalized_embeddings.rows([0])[0]
+
+
+def test_default_n_probe_applies_only_when_unset():
+    assert SuggestOptions(search_mode="ann").resolved().n_probe == ANN_N_PROBE
+    assert SuggestOptions(search_mode="ann", n_probe=1).resolved().n_probe == 1
+    assert SuggestOptions(search_mode="exact", n_probe=3).resolved().n_probe is None
+
+@pytest.mark.parametrize("n_probe", [0, -1])
+def test_invalid_n_probe_is_rejected(recipe_index, n_probe):
+    with pytest.raises(ValueError):
+        SuggestOptions(search_mode="ann", n_probe=n_probe).resolved()
+    with pytest.raises(ValueError):
+        recipe_index.ann_index.candidates(_query(recipe_index), n_probe)
+    with pytest.raises(HTTPException) as error:
+        IngredientRequest(ingredients=QUERY, search_mode="ann", n_probe=n_probe).suggest_options()
+    assert error.value.status_code == 400
+
+def test_n_probe_above_list_count_probes_every_list(recipe_index):
+    ann_index = recipe_index.ann_index
+    candidates = ann_index.candidates(_query(recipe_index), ann_index.n_lists + 5)
+    assert len(candidates) == len(recipe_index.normalized_embeddings)
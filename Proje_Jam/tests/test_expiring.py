@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Product
+from routers.crud import get_expiring_ingredients
+
+TODAY = date(2026, 10, 18)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def _add(db, name, age_days, expires_in=None, user_id=1, **flags):
+    expiration_date = TODAY + timedelta(days=expires_in) if expires_in is not None else None
+    db.add(Product(name=name, category="x", quantity=1, price=1, user_id=user_id,
+                   date_added=TODAY - timedelta(days=age_days), expiration_date=expiration_date, **flags))
+
+def test_items_are_selected_by_expiration_date(db):
+    _add(db, "marul", 1, expires_in=1)           # 1 gün kaldı
+    _add(db, "domates", 9)                       # varsayılan raf ömrüyle süresi geçmiş
+    _add(db, "yoğurt", 3, expires_in=7)          # 7 gün kaldı
+    _add(db, "pirinç", 400, expires_in=-35)      # uzun raf ömürlü, süresi geçmiş
+    _add(db, "un", 500, expires_in=-90)          # süresi geriye bakış penceresinden önce geçmiş
+    _add(db, "bulgur", 500, expires_in=30)       # eski ama süresi dolmamış
+    db.commit()
+
+    assert get_expiring_ingredients(db, 1, today=TODAY) == {"domates": 1.0, "pirinç": 1.0, "marul": 0.5}
+
+def test_other_users_and_used_up_items_are_ignored(db):
+    _add(db, "süt", 6, is_consumed=True)
+    _add(db, "biber", 6, is_discarded=True)
+    _add(db, "çilek", 6, user_id=2)
+    _add(db, "soğan", 6)
+    db.commit()
+
+    assert get_expiring_ingredients(db, 1, today=TODAY) == {"soğan": 0.5}
+
+def test_selection_is_a_range_query_on_both_indexes(db):
+    statements = []
+
+    def listener(conn, cursor, statement, params, context, executemany):
+        statements.append((statement, params))
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    get_expiring_ingredients(db, 1, today=TODAY)
+    event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    statement, params = statements[-1]
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params))
+    assert "ix_products_user_id_expiration_date (user_id=? AND expiration_date>? AND expiration_date<?)" in plan
+    assert "ix_products_user_id_date_added (user_id=? AND date_added>? AND date_added<?)" in plan
@@ -0,0 +1,46 @@
+import numpy as np
+
+from routers.ingredient_index import InvertedIngredientIndex, InvertedIngredientIndexWriter
+from routers.ingredient_parser import parse_ingredients_bulk
+
+
+def _parsed(corpus):
+    return parse_ingredients_bulk(corpus["ingredients"].tolist())
+
+def test_writer_matches_in_memory_build(tmp_path, corpus, vectorizer, monkeypatch):
+    parsed = _parsed(corpus)
+    analyzer = vectorizer.build_analyzer()
+    expected = InvertedIngredientIndex.build(parsed, vectorizer.vocabulary, analyzer)
+
+    # Küçük blok, dağıtımın birden çok bloğa bölündüğü yolu da çalıştırır
+    monkeypatch.setattr(InvertedIngredientIndexWriter, "SCATTER_BLOCK_SIZE", 97)
+    writer = InvertedIngredientIndexWriter(tmp_path, vectorizer.vocabulary, analyzer)
+    for start in range(0, len(parsed), 64):
+        writer.append(parsed[start:start + 64])
+    writer.close()
+    actual = InvertedIngredientIndex.load(tmp_path)
+
+    for name in ("item_recipe", "recipe_item_offsets", "term_offsets", "term_items"):
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+    assert not (tmp_path / InvertedIngredientIndexWriter.PAIRS).exists()
+
+def test_posting_lists_are_sorted(tmp_path, corpus, vectorizer):
+    writer = InvertedIngredientIndexWriter(tmp_path, vectorizer.vocabulary, vectorizer.build_analyzer())
+    writer.append(_parsed(corpus))
+    writer.close()
+    index = InvertedIngredientIndex.load(tmp_path)
+    for t in range(len(index.term_offsets) - 1):
+        assert np.all(np.diff(index.term_items[index.term_offsets[t]:index.term_offsets[t + 1]]) > 0)
+
+def test_coverage_matches_brute_force(corpus, vectorizer):
+    parsed = _parsed(corpus)
+    analyzer = vectorizer.build_analyzer()
+    index = InvertedIngredientIndex.build(parsed, vectorizer.vocabulary, analyzer)
+    terms = {"domates", "soğan"}
+    term_ids = [vectorizer.vocabulary[t] for t in terms if t in vectorizer.vocabulary]
+
+    rows = np.arange(len(parsed))
+    matched, missing = index.shortlist_coverage(rows, index.item_mask(term_ids))
+    for row, items in enumerate(parsed):
+        hits = sum(1 for item in items if set(analyzer(item)) & terms)
+        assert (matched[row], missing[row]) == (hits, len(items) - hits)
@@ -0,0 +1,25 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Recipe, RecipeBase
+
+
+def test_recipe_schema_round_trips_a_stored_recipe():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Recipe(id=1, yemek="Mercimek Çorbası", mutfagi="Türk", sure_min=20, sure=40,
+               malzeme="1 su bardağı mercimek, 1 adet soğan", yapilisi="Haşlayın."),
+        # Açık uçlu süre ("60 dk-Fazla") ve mutfağı boş tarif
+        Recipe(id=2, yemek="Kuru Fasulye", sure_min=60, malzeme="2 su bardağı fasulye", yapilisi="Pişirin."),
+    ])
+    session.commit()
+
+    for recipe in session.query(Recipe).order_by(Recipe.id):
+        schema = RecipeBase.model_validate(recipe)
+        dumped = schema.model_dump()
+        assert dumped == {column.name: getattr(recipe, column.name) for column in Recipe.__table__.columns}
+        assert RecipeBase.model_validate(dumped) == schema
+    session.close()
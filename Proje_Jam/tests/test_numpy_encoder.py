@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from routers.numpy_encoder import check_keras_parity, encode_bags
+from routers.recipe_artifact import ENCODER_PATH
+
+
+def test_keras_parity():
+    pytest.importorskip("tensorflow")
+    assert check_keras_parity(ENCODER_PATH, n_samples=128) < 1e-5
+
+def test_sparse_input_matches_dense(vectorizer, encoder):
+    X = vectorizer.transform(["domates soğan biber", "un şeker yumurta süt tereyağı", ""])
+    np.testing.assert_allclose(encode_bags(encoder, X), encoder.predict(X.toarray()), atol=1e-5)
+
+def test_batches_match_single_pass(vectorizer, encoder, corpus):
+    X = vectorizer.transform(corpus["ingredients"].head(50))
+    np.testing.assert_allclose(encode_bags(encoder, X, batch_size=7), encode_bags(encoder, X), rtol=1e-5)
@@ -0,0 +1,113 @@
+import math
+
+import pytest
+from pydantic import ValidationError
+
+from routers import crud, recipe_index as ri
+from routers.products import MAX_RECIPE_PAGE_SIZE, BatchIngredientRequest
+from routers.recipe_index import (
+    CursorExpired,
+    InvalidCursor,
+    SuggestOptions,
+    decode_suggestion_cursor,
+    encode_suggestion_cursor,
+)
+
+QUERY = ["domates", "soğan", "biber"]
+
+
+@pytest.fixture
+def live_index(recipe_index, monkeypatch):
+    # Süreç geneli index test index'iyle değiştirilir; DB yoklanmaz
+    monkeypatch.setattr(ri, "_recipe_index", recipe_index)
+    monkeypatch.setattr(ri, "CHANGE_POLL_SECONDS", math.inf)
+    # Bölüm sınırı küçük tutulur ki sayfalama birçok bölümden geçsin
+    monkeypatch.setattr(ri, "PAGING_MAX_RESULTS", 7)
+    monkeypatch.setattr(crud, "PAGING_MAX_RESULTS", 7)
+    ri.suggestion_page_cache.clear()
+    yield recipe_index
+    ri.suggestion_page_cache.clear()
+
+def _all_pages(page_size, options=None):
+    ids, cursor = [], None
+    while True:
+        page = crud.suggest_recipes_page(QUERY, page_size, cursor, options)
+        ids += [hit["id"] for hit in page["suggested_recipes"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+def test_cursor_round_trip():
+    cursor = encode_suggestion_cursor("abc123", 40)
+    assert "=" not in cursor
+    assert decode_suggestion_cursor(cursor) == ("abc123", 40)
+
+@pytest.mark.parametrize("cursor", ["zzz", encode_suggestion_cursor("abc", 1)[:-2], "YWJjOi0x"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_suggestion_cursor(cursor)
+
+@pytest.mark.parametrize("ranking", ["similarity", "hybrid"])
+def test_pages_cover_the_whole_ranking_past_the_partition_limit(live_index, ranking):
+    options = SuggestOptions(ranking=ranking)
+    ids = _all_pages(5, options)
+    assert len(ids) == len(set(ids)) == len(live_index.titles)
+    assert ids[:7] == [hit["id"] for hit in live_index.suggest_ranked(QUERY, 7, options).hits()]
+
+def test_similarity_pages_match_a_single_ranking(live_index):
+    ids = _all_pages(6)
+    assert ids == [hit["id"] for hit in live_index.suggest_ranked(QUERY, len(ids)).hits()]
+
+def test_filtered_pages_stop_when_candidates_run_out(live_index):
+    ids = _all_pages(5, SuggestOptions(max_duration=20))
+    assert 0 < len(ids) < len(live_index.titles)
+    assert all(live_index.durations_min[live_index.base_rows([recipe_id])[0]] <= 20 for recipe_id in ids)
+
+def test_pages_keep_their_snapshot_across_index_changes(live_index):
+    first = crud.suggest_recipes_page(QUERY, 5)
+    second_before = [hit["id"] for hit in live_index.suggest_ranked(QUERY, 10).hits()][5:]
+    live_index.apply_changes(deleted_ids=second_before[:2])
+
+    second = crud.suggest_recipes_page(QUERY, 5, first["next_cursor"])
+    assert [hit["id"] for hit in second["suggested_recipes"]] == second_before
+
+def test_offset_beyond_the_ranking_does_not_extend_it(live_index):
+    first = crud.suggest_recipes_page(QUERY, 5)
+    key, _ = decode_suggestion_cursor(first["next_cursor"])
+    page = crud.suggest_recipes_page(QUERY, 5, encode_suggestion_cursor(key, 10_000))
+    assert page["suggested_recipes"] == []
+    assert len(ri.suggestion_page_cache.get(key)) == 7
+
+def test_expired_cursor(live_index):
+    first = crud.suggest_recipes_page(QUERY, 5)
+    ri.suggestion_page_cache.clear()
+    with pytest.raises(CursorExpired):
+        crud.suggest_recipes_page(QUERY, 5, first["next_cursor"])
+
+def test_batch_and_cook_now_return_their_term_reports(live_index):
+    queries = [QUERY, ["yumurta", "xyzzy"]]
+    results = crud.suggest_recipes_batch(queries, top_n=3)
+    assert [result["query_terms"] for result in results] == [live_index.query_terms(q)[1] for q in queries]
+    assert [len(result["suggested_recipes"]) for result in results] == [3, 3]
+
+    cook = crud.suggest_recipes_to_cook_now(queries[1], top_n=3)
+    assert cook["query_terms"] == live_index.query_terms(queries[1])[1]
+    assert "xyzzy" in cook["query_terms"]["dropped"]
+
+def test_batch_items_take_their_own_top_n(live_index):
+    queries = [QUERY, ["yumurta", "peynir"]]
+    results = crud.suggest_recipes_batch(queries, top_ns=[2, 9])
+    assert [[hit["id"] for hit in result["suggested_recipes"]] for result in results] == [
+        [hit["id"] for hit in live_index.suggest_ranked(query, k).hits()] for query, k in zip(queries, [2, 9])
+    ]
+
+@pytest.mark.parametrize("top_n", [0, -1, MAX_RECIPE_PAGE_SIZE + 1])
+def test_batch_top_n_is_bounded_like_a_page(top_n):
+    assert BatchIngredientRequest(ingredients=QUERY).top_n == 5
+    with pytest.raises(ValidationError):
+        BatchIngredientRequest(ingredients=QUERY, top_n=top_n)
+
+def test_first_page_reports_the_inputs_as_typed(live_index):
+    crud.suggest_recipes_page(QUERY, 5)
+    page = crud.suggest_recipes_page(["Domates", "SOĞAN", "biber"], 5)
+    assert [entry["input"] for entry in page["query_terms"]["mapped"]] == ["Domates", "SOĞAN", "biber"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from routers import quantization
+from routers.quantization import open_embeddings, write_quantized
+from routers.recipe_ranking import l2_normalize, top_k_indices
+
+
+@pytest.fixture
+def normalized(corpus, vectorizer, encoder):
+    return l2_normalize(encoder.predict(vectorizer.transform(corpus["ingredients"])).astype(np.float32))
+
+def test_int8_kernel_matches_dequantized_rows(tmp_path, normalized, monkeypatch):
+    write_quantized(tmp_path, normalized, block_rows=64)
+    int8 = open_embeddings(tmp_path, "int8", normalized)
+    # Skorlama birden çok blokta yapılsın
+    monkeypatch.setattr(quantization, "SCORE_BLOCK_ROWS", 50)
+    queries = normalized[:5]
+
+    expected = queries @ int8.rows(np.arange(len(int8))).T
+    np.testing.assert_allclose(int8.scores(queries), expected, atol=1e-4)
+
+def test_int8_scores_close_to_float32(tmp_path, normalized):
+    write_quantized(tmp_path, normalized)
+    queries = normalized[10:20]
+    reference = open_embeddings(tmp_path, "float32", normalized).scores(queries)
+    int8_scores = open_embeddings(tmp_path, "int8", normalized).scores(queries)
+
+    assert np.max(np.abs(int8_scores - reference)) < 0.02
+    for expected, actual in zip(reference, int8_scores):
+        assert len(set(top_k_indices(expected, 10)) & set(top_k_indices(actual, 10))) >= 8
+
+def test_int8_codes_are_a_quarter_of_float32(tmp_path, normalized):
+    write_quantized(tmp_path, normalized)
+    int8 = open_embeddings(tmp_path, "int8", normalized)
+    assert int8.codes.dtype == np.int8
+    assert int8.codes.nbytes * 4 == normalized.nbytes
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from routers.recipe_index import SuggestOptions
+from routers.recipe_loader import RECIPE_COLUMNS
+
+QUERIES = [["domates", "soğan", "yumurta"], ["tavuk", "patates"], ["kinoa", "tofu", "ejderha meyvesi"]]
+NEW_RECIPE = {"id": 100_000, "title": "Ejderhalı Kinoa Salatası", "cuisine": "Diger", "duration_min": 15, "duration": 15,
+              "ingredients": "1 adet ejderha meyvesi, 1 su bardağı kinoa, 200 gr tofu", "instructions": "karıştır"}
+
+
+def _recipes(rows):
+    return pd.DataFrame(rows, columns=RECIPE_COLUMNS)
+
+def _hits(index, query, k=10, options=None):
+    return [(hit["id"], round(hit["similarity"], 4)) for hit in index.suggest_ranked(query, k, options).hits()]
+
+def _ids(index, query, k=10, options=None):
+    return [recipe_id for recipe_id, _ in _hits(index, query, k, options)]
+
+def _cook_counts(index, query, k=10):
+    return [(hit["matched_count"], hit["missing_count"]) for hit in index.cook_now(query, top_n=k)[0]]
+
+@pytest.fixture
+def changes(corpus):
+    deleted = [int(corpus["id"].iat[1]), int(corpus["id"].iat[4])]
+    updated = corpus.iloc[[0]].copy()
+    updated["ingredients"] = "2 adet ejderha meyvesi, 1 su bardağı kinoa"
+    return _recipes([*updated.to_dict("records"), NEW_RECIPE]), deleted
+
+def test_deleted_recipes_are_tombstoned(recipe_index):
+    victim = _ids(recipe_index, QUERIES[0])[0]
+    version = recipe_index.apply_changes(deleted_ids=[victim])
+
+    assert version == 1
+    assert victim not in _ids(recipe_index, QUERIES[0], k=50)
+    assert victim not in [hit["id"] for hit in recipe_index.cook_now(QUERIES[0], top_n=50)[0]]
+    assert recipe_index.state.base_tombstones == 1
+    assert len(_ids(recipe_index, QUERIES[0], k=10)) == 10
+
+def test_upserts_go_to_the_delta_segment(recipe_index, changes):
+    upserts, _ = changes
+    recipe_index.apply_changes(upserts)
+
+    assert len(recipe_index.state.delta) == 2
+    assert recipe_index.state.base_tombstones == 1
+    assert set(_ids(recipe_index, QUERIES[2], k=2)) == set(upserts["id"])
+
+def test_updating_a_delta_row_replaces_it(recipe_index):
+    recipe_index.apply_changes(_recipes([NEW_RECIPE]))
+    recipe_index.apply_changes(_recipes([{**NEW_RECIPE, "title": "Yeni Başlık"}]))
+
+    delta = recipe_index.state.delta
+    assert len(delta) == 1
+    assert delta.recipes["title"].tolist() == ["Yeni Başlık"]
+    recipe_index.apply_changes(deleted_ids=[NEW_RECIPE["id"]])
+    assert len(recipe_index.state.delta) == 0
+
+def test_live_index_matches_a_rebuilt_index(recipe_index, build_index, corpus, changes):
+    upserts, deleted = changes
+    recipe_index.apply_changes(upserts, deleted)
+
+    changed = set(upserts["id"]) | set(deleted)
+    rebuilt_corpus = pd.concat([corpus[~corpus["id"].isin(changed)], upserts], ignore_index=True)
+    rebuilt = build_index(rebuilt_corpus.sort_values("id").reset_index(drop=True), "rebuilt")
+
+    for query in QUERIES:
+        for options in (SuggestOptions(), SuggestOptions(ranking="hybrid"), SuggestOptions(max_duration=30),
+                        SuggestOptions(min_duration=45)):
+            live, fresh = _hits(recipe_index, query, 10, options), _hits(rebuilt, query, 10, options)
+            assert [recipe_id for recipe_id, _ in live] == [recipe_id for recipe_id, _ in fresh]
+            np.testing.assert_allclose([s for _, s in live], [s for _, s in fresh], atol=1e-3)
+        # Eşit puanlı tariflerin sırası satır düzenine bağlı; puan dizisi aynı olmalı
+        assert _cook_counts(recipe_index, query) == _cook_counts(rebuilt, query)
+
+def test_queries_keep_a_consistent_snapshot(recipe_index):
+    state = recipe_index.state
+    before = recipe_index.search(recipe_index.encode(["domates soğan"])[0], 5, state=state)
+    recipe_index.apply_changes(deleted_ids=[int(recipe_index.recipe_ids[before[0][0]])])
+
+    again = recipe_index.search(recipe_index.encode(["domates soğan"])[0], 5, state=state)
+    np.testing.assert_array_equal(before[0], again[0])
+    assert before[0][0] not in recipe_index.search(recipe_index.encode(["domates soğan"])[0], 5)[0]
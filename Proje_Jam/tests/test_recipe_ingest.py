@@ -0,0 +1,14 @@
+import numpy as np
+
+from routers.recipe_ingest import EmbeddingReuse, encode_texts
+
+
+def test_reuse_copies_known_texts_from_the_artifact(recipe_index, vectorizer, encoder):
+    reuse = EmbeddingReuse()
+    reuse.add_artifact(recipe_index.artifact)
+    texts = [" ".join(recipe_index.parsed_ingredients[row]) for row in (5, 0, 42)] + ["ejderha meyvesi kinoa"]
+
+    embeddings, encoded = reuse.encode(vectorizer, encoder, texts)
+    assert encoded == 1
+    np.testing.assert_array_equal(embeddings[:3], recipe_index.recipe_embeddings[[5, 0, 42]])
+    np.testing.assert_allclose(embeddings[3], encode_texts(vectorizer, encoder, texts[3:])[0], rtol=1e-5)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from routers.recipe_index import duration_mask
+from routers.recipe_ingest import frame_chunks
+from routers.recipe_loader import parse_duration_range, read_recipe_chunks, read_recipes_csv, staged_recipes_csv
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("20-40 dk", (20, 40)),
+    ("30 dk", (30, 30)),
+    ("1,5saat", (90, 90)),
+    ("60 dk-Fazla", (60, None)),
+    ("belirsiz", (None, None)),
+    (None, (None, None)),
+])
+def test_duration_labels_keep_both_bounds(label, expected):
+    assert parse_duration_range(label) == expected
+
+def test_duration_filter_matches_overlapping_ranges():
+    # 20-40 dk, 30 dk, 60 dk-Fazla, bilinmiyor
+    durations_min = np.array([20, 30, 60, -1])
+    durations = np.array([40, 30, -1, -1])
+
+    assert duration_mask(durations_min, durations, max_duration=25).tolist() == [True, False, False, False]
+    assert duration_mask(durations_min, durations, min_duration=35).tolist() == [True, False, True, False]
+    assert duration_mask(durations_min, durations, 30, 30).tolist() == [True, True, False, False]
+    assert duration_mask(durations_min, durations).tolist() == [True, True, True, False]
+
+def test_staged_csv_streams_in_id_order_like_the_table(tmp_path, corpus):
+    # CSV'deki sıra id sırası değildir
+    sample = corpus.iloc[::-1].head(40)
+    labels = {20: "20-40 dk", 30: "30 dk"}
+    csv_path = tmp_path / "recipes.csv"
+    sample.drop(columns="duration_min").assign(
+        duration=[labels.get(minutes, "60 dk-Fazla") for minutes in sample["duration"]]
+    ).to_csv(csv_path, sep=";", index=False)
+
+    with staged_recipes_csv(csv_path, batch_size=7) as engine:
+        streamed = list(read_recipe_chunks(engine, chunk_size=16))
+    expected = list(frame_chunks(read_recipes_csv(csv_path), 16))
+
+    assert [len(chunk[0]) for chunk in streamed] == [16, 16, 8]
+    assert [list(map(list, chunk)) for chunk in streamed] == [list(map(list, chunk)) for chunk in expected]
+    np.testing.assert_array_equal(np.concatenate([chunk[0] for chunk in streamed]), np.sort(sample["id"]))
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from routers.recipe_ranking import top_k_cosine_batch, top_k_indices
+
+
+@pytest.mark.parametrize("k", [1, 3, 7, 10, 12])
+def test_ties_are_broken_by_index(k):
+    scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5, 0.9, 0.5, 0.1, 0.5], dtype=np.float32)
+    expected = np.lexsort((np.arange(len(scores)), -scores))[:k]
+    np.testing.assert_array_equal(top_k_indices(scores, k), expected)
+
+def test_larger_k_extends_the_smaller_ranking():
+    scores = np.random.default_rng(0).integers(0, 4, 500).astype(np.float32)
+    small, large = top_k_indices(scores, 40), top_k_indices(scores, 200)
+    np.testing.assert_array_equal(large[:40], small)
+
+def test_batch_matches_single_queries():
+    rng = np.random.default_rng(1)
+    embeddings = rng.random((300, 8), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    queries = rng.random((4, 8), dtype=np.float32)
+    for query, (indices, scores) in zip(queries, top_k_cosine_batch(embeddings, queries, 10)):
+        expected = top_k_indices(embeddings @ (query / np.linalg.norm(query)), 10)
+        np.testing.assert_array_equal(indices, expected)
+        assert np.all(np.diff(scores) <= 0)
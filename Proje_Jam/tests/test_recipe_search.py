@@ -0,0 +1,48 @@
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Recipe
+from routers.recipe_search import build_match_query, search_recipes
+
+FTS_MIGRATION = Path(__file__).parents[1] / "alembic" / "versions" / "160268d07782_add_recipes_fts.py"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    # FTS tablosu ve tetikleyicileri migration'daki SQL ile kurulur
+    spec = importlib.util.spec_from_file_location("add_recipes_fts", FTS_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as connection:
+        migration.op = SimpleNamespace(execute=connection.exec_driver_sql)
+        migration.upgrade()
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Recipe(id=1, yemek="İçli Köfte", mutfagi="Türk", sure=60, malzeme="bulgur, kıyma", yapilisi="Kızartın."),
+        Recipe(id=2, yemek="Irmik Helvası", mutfagi="Türk", sure=30, malzeme="irmik, şeker", yapilisi="Kavurun."),
+        Recipe(id=3, yemek="Şakşuka", mutfagi="Türk", sure=40, malzeme="patlıcan, biber", yapilisi="Çevirin."),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+def test_capitalised_turkish_letters_fold_like_the_index():
+    assert build_match_query("İçli KÖFTE") == '"icli"* "kofte"*'
+    assert build_match_query("IRMIK") == '"irmik"*'
+    assert build_match_query("kâse") == '"kase"*'
+
+@pytest.mark.parametrize("query, recipe_id", [
+    ("İçli köfte", 1), ("içli köfte", 1), ("ICLI", 1),
+    ("Irmik", 2), ("IRMIK HELVASI", 2),
+    ("Şakşuka", 3), ("ŞAKŞUKA", 3), ("Çevirin", 3),
+])
+def test_search_ignores_case_and_turkish_letters(db, query, recipe_id):
+    assert [recipe["id"] for recipe in search_recipes(db, query)] == [recipe_id]
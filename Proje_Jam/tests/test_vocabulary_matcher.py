@@ -0,0 +1,31 @@
+import pytest
+
+from routers.vocabulary_matcher import fold
+
+
+def test_fold_handles_capital_turkish_letters():
+    assert fold("İsot") == "isot"
+    assert fold("IRMIK") == "irmik"
+    assert fold("ŞEKER") == fold("Şeker") == "seker"
+    assert fold("Çilek") == "cilek"
+    assert fold("kâse") == "kase"
+
+@pytest.mark.parametrize("user_input, term, kind", [
+    ("İsot", "isot", "exact"), ("İNCİR", "incir", "exact"), ("ŞEKER", "şeker", "exact"),
+    ("Çilek", "çilek", "exact"), ("IRMIK", "irmik", "folded"), ("Isot", "isot", "folded"),
+])
+def test_capitalised_inputs_are_not_dropped_or_fuzzy_matched(recipe_index, user_input, term, kind):
+    _, report = recipe_index.query_terms([user_input])
+    assert report == {"mapped": [{"input": user_input, "term": term, "match": kind}], "dropped": []}
+
+def test_report_is_keyed_on_the_users_inputs(recipe_index):
+    inputs = ["İsot", "Zeytin Yağı", "domatess", "xyzq", "İsot"]
+    term_ids, report = recipe_index.query_terms(inputs)
+
+    assert report["mapped"] == [
+        {"input": "İsot", "term": "isot", "match": "exact"},
+        {"input": "Zeytin Yağı", "term": "zeytin yağı", "match": "exact"},
+        {"input": "domatess", "term": "domates", "match": "fuzzy"},
+    ]
+    assert report["dropped"] == ["xyzq"]
+    assert recipe_index.vocabulary_matcher.text(term_ids) == "isot zeytin yağı domates isot"